@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -128,4 +129,41 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 # Custom Configurations
-MICROSERVICE_URL = 'http://localhost:8000'
\ No newline at end of file
+MICROSERVICE_URL = 'http://localhost:8000'
+# Pooled keep-alive connections to the microservice, per event loop (one per process under ASGI)
+MICROSERVICE_MAX_CONNECTIONS = 20
+
+# Departments ingested from the microservice
+RESEARCH_DEPARTMENTS = ['CSCI', 'MATH']
+
+# Rows per INSERT ... ON CONFLICT statement when ingesting
+INGEST_BATCH_SIZE = 500
+COURSE_DEPARTMENTS = ['CSCI', 'MATH', 'PSYCH', 'BUS']
+
+# API responses are cached per source/department and cleared when that source is refreshed
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'planner',
+    }
+}
+PLANNER_CACHE_TIMEOUT = 300
+
+# Rows per API page when ?limit= is not given, and the most a client may ask for
+PLANNER_PAGE_SIZE = 100
+PLANNER_MAX_PAGE_SIZE = 1000
+
+# Results per research search when ?limit= is not given
+PLANNER_SEARCH_LIMIT = 20
+
+# Student-to-professor matching: hashed TF-IDF vectors of every professor, updated on ingest.
+# Memory is professors x dimensions x 4 bytes (2,000 professors: 32 MB).
+PLANNER_MATCH_INDEX_PATH = os.environ.get('PLANNER_MATCH_INDEX_PATH', str(BASE_DIR / 'data' / 'match_index.npz'))
+PLANNER_MATCH_DIMENSIONS = 4096
+
+# Pull every source from the microservice in a background thread of the web process.
+# Alternatively, schedule `manage.py refresh_planner_data` (e.g. with cron) and leave this off.
+PLANNER_BACKGROUND_REFRESH = os.environ.get('PLANNER_BACKGROUND_REFRESH', 'false').lower() == 'true'
+PLANNER_REFRESH_INTERVAL = int(os.environ.get('PLANNER_REFRESH_INTERVAL', 6 * 60 * 60))
+# A page view retries a failed first refresh of a source no sooner than this
+PLANNER_REFRESH_RETRY_SECONDS = 15 * 60
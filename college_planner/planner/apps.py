@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class PlannerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'planner'
+
+    def ready(self):
+        if settings.PLANNER_BACKGROUND_REFRESH:
+            from .services.refresh import start_scheduler
+            start_scheduler()
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from planner.services.data_processor import DataProcessor
+
+
+class Command(BaseCommand):
+    help = "Pulls research, course and event data from the microservice into the planner tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", choices=["research", "courses", "events"],
+                            help="Only refresh this source (default: all)")
+        parser.add_argument("--department", help="Only refresh this department")
+
+    def handle(self, *args, **options):
+        processor = DataProcessor()
+        if options["source"]:
+            counts = processor.refresh(options["source"], options["department"])
+            self.stdout.write(f"{options['source']} {options['department'] or ''}: {counts}")
+            return
+        for key, counts in processor.refresh_all().items():
+            self.stdout.write(f"{key}: {counts}")
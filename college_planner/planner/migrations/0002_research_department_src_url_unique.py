@@ -0,0 +1,39 @@
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_research(apps, schema_editor):
+    """
+    Earlier ingests created a new row per professor on every run; keep the newest row per src_url
+    so the unique constraint can be added.
+    """
+    Research = apps.get_model("planner", "Research")
+    duplicates = (
+        Research.objects.values("src_url")
+        .annotate(rows=Count("id"), keep_id=Max("id"))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        Research.objects.filter(src_url=duplicate["src_url"]).exclude(id=duplicate["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0001_initial'),
+    ]
+
+    operations = [
+        # The model has had this field since 0001 but no migration added it
+        migrations.AddField(
+            model_name='research',
+            name='department',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.RunPython(remove_duplicate_research, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='research',
+            constraint=models.UniqueConstraint(fields=('src_url',), name='research_src_url_unique'),
+        ),
+    ]
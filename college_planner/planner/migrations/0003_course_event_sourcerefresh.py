@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0002_research_department_src_url_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Course',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(max_length=255)),
+                ('course_code', models.CharField(blank=True, default='', max_length=32)),
+                ('course_name', models.CharField(max_length=255)),
+                ('course_description', models.TextField(blank=True, default='')),
+                ('prereqs', models.TextField(blank=True, default='')),
+                ('credits', models.IntegerField(default=-1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('department', 'course_code', 'course_name'), name='course_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_name', models.CharField(max_length=255)),
+                ('date', models.CharField(max_length=255)),
+                ('page_url', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('page_url',), name='event_page_url_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SourceRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=32)),
+                ('department', models.CharField(blank=True, default='', max_length=255)),
+                ('refreshed_at', models.DateTimeField(null=True)),
+                ('attempted_at', models.DateTimeField(null=True)),
+                ('status', models.CharField(default='never', max_length=32)),
+                ('counts', models.JSONField(default=dict)),
+                ('error', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source', 'department'), name='source_refresh_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:28
+
+from django.db import migrations, models
+
+
+def add_search_vector(apps, schema_editor):
+    """
+    Postgres only: a generated tsvector over research interests (weight A) and names (weight B)
+    with a GIN index. Other databases search through planner.services.search's in-process index.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = schema_editor.quote_name(apps.get_model("planner", "Research")._meta.db_table)
+    schema_editor.execute(
+        f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(research_interest, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(professor_name, '')), 'B')) STORED"
+    )
+    schema_editor.execute(f"CREATE INDEX research_search_vector_idx ON {table} USING GIN (search_vector)")
+
+
+def remove_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = schema_editor.quote_name(apps.get_model("planner", "Research")._meta.db_table)
+    schema_editor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0004_listing_indexes'),
+    ]
+
+    operations = [
+        # Interests were squeezed into 255 characters
+        migrations.AlterField(
+            model_name='research',
+            name='research_interest',
+            field=models.TextField(),
+        ),
+        # Postgres won't alter columns a generated column depends on: a later migration that
+        # changes research_interest or professor_name has to drop and re-add search_vector
+        migrations.RunPython(add_search_vector, remove_search_vector),
+    ]
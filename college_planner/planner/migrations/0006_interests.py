@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0005_research_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Interest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('professor_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-professor_count', 'name'], name='interest_count_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='research',
+            name='interests',
+            field=models.ManyToManyField(blank=True, related_name='professors', to='planner.interest'),
+        ),
+        migrations.CreateModel(
+            name='DepartmentInterest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(max_length=255)),
+                ('professor_count', models.IntegerField(default=0)),
+                ('interest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='departments', to='planner.interest')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['department', '-professor_count'], name='department_interest_count_idx')],
+                'constraints': [models.UniqueConstraint(fields=('department', 'interest'), name='department_interest_unique')],
+            },
+        ),
+    ]
@@ -5,10 +5,121 @@ class Research(models.Model):
     professor_name = models.CharField(max_length=255)
     department = models.CharField(max_length=255)
     website = models.CharField(max_length=255)
-    research_interest = models.CharField(max_length=255)
+    # Comma-separated; searched through the search_vector column on Postgres (see planner.services.search)
+    research_interest = models.TextField()
     src_url = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Canonicalized from research_interest on ingest (see planner.services.interests)
+    interests = models.ManyToManyField("Interest", related_name="professors", blank=True)
 
+    class Meta:
+        constraints = [
+            # One row per professor page, so re-ingesting a department updates instead of duplicating
+            models.UniqueConstraint(fields=["src_url"], name="research_src_url_unique"),
+        ]
+        indexes = [
+            # Department listings are paged by (created_at, id)
+            models.Index(fields=["department", "created_at", "id"], name="research_dept_created_idx"),
+        ]
 
     def __str__(self):
-        return self.professor_name
\ No newline at end of file
+        return self.professor_name
+
+
+class Course(models.Model):
+    department = models.CharField(max_length=255)
+    course_code = models.CharField(max_length=32, blank=True, default="")
+    course_name = models.CharField(max_length=255)
+    course_description = models.TextField(blank=True, default="")
+    prereqs = models.TextField(blank=True, default="")
+    credits = models.IntegerField(default=-1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["department", "course_code", "course_name"], name="course_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["department", "created_at", "id"], name="course_dept_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.course_code} {self.course_name}".strip()
+
+
+class Event(models.Model):
+    event_name = models.CharField(max_length=255)
+    # As shown on the events site, e.g. "Friday, October 18 at 7:00PM PDT"
+    date = models.CharField(max_length=255)
+    page_url = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["page_url"], name="event_page_url_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="event_created_idx"),
+        ]
+
+    def __str__(self):
+        return self.event_name
+
+
+class SourceRefresh(models.Model):
+    """
+    When each source/department was last pulled from the microservice.
+    """
+    source = models.CharField(max_length=32)
+    # Empty for sources without departments (events)
+    department = models.CharField(max_length=255, blank=True, default="")
+    refreshed_at = models.DateTimeField(null=True)
+    attempted_at = models.DateTimeField(null=True)
+    status = models.CharField(max_length=32, default="never")
+    counts = models.JSONField(default=dict)
+    error = models.TextField(blank=True, default="")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["source", "department"], name="source_refresh_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.source}:{self.department}"
+
+
+class Interest(models.Model):
+    """
+    One canonical research interest, e.g. "machine learning" for "Machine-Learning" and "ML".
+    """
+    name = models.CharField(max_length=255, unique=True)
+    # Precomputed on ingest: number of professors linked to this interest
+    professor_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-professor_count", "name"], name="interest_count_idx"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class DepartmentInterest(models.Model):
+    """
+    Precomputed on ingest: how many professors in a department share an interest.
+    """
+    department = models.CharField(max_length=255)
+    interest = models.ForeignKey(Interest, on_delete=models.CASCADE, related_name="departments")
+    professor_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["department", "interest"], name="department_interest_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["department", "-professor_count"], name="department_interest_count_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.department}: {self.interest}"
@@ -1,23 +1,252 @@
-from .microservice_client import MicroserviceClient
-from planner.models import Research
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+import logging
+
+from .interests import link_interests, refresh_interest_counts, split_interests
+from .matching import update_match_index
+from .microservice_client import MicroserviceClient, run_sync
+from planner.models import Course, Event, Research, SourceRefresh
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fields refreshed when a professor page is ingested again
+RESEARCH_UPDATE_FIELDS = ["professor_name", "department", "website", "research_interest"]
+COURSE_UPDATE_FIELDS = ["course_description", "prereqs", "credits"]
+EVENT_UPDATE_FIELDS = ["event_name", "date"]
+
+
+def api_cache_key(source, department=None):
+    """
+    Django cache key of a source/department's refreshed_at, cleared whenever it is refreshed.
+    Cached API pages are keyed by refreshed_at, so clearing it makes them all stale.
+    """
+    return f"planner:{source}:{department or ''}"
+
 
 class DataProcessor:
     def __init__(self):
         self.microservice_client = MicroserviceClient()
 
-    def process_research_data(self):
-        department = "CSCI"
-        research_data = self.microservice_client.get_research(department)
-        if not research_data:
-            return
+    async def arefresh(self, source, department=None):
+        """
+        Pulls one source/department from the microservice into the planner tables, records when
+        it was refreshed and clears its cached API response.
+
+        Returns:
+            Inserted, updated and unchanged row counts, or None if the microservice returned nothing.
+        """
+        now = timezone.now()
+        try:
+            if source == "research":
+                data = await self.microservice_client.get_research(department)
+                if not isinstance(data, list):
+                    data = None
+            elif source == "courses":
+                data = await self.microservice_client.get_course(department)
+            elif source == "events":
+                data = await self.microservice_client.get_events()
+            else:
+                raise ValueError(f"Unknown source: {source}")
+        except Exception as e:
+            logger.error(f"Error refreshing {source} {department or ''}: {e}")
+            await sync_to_async(self._record_refresh)(source, department, now, None, error=e)
+            return None
+        return await sync_to_async(self._store)(source, department, now, data)
+
+    def refresh(self, source, department=None):
+        """
+        Synchronous version of arefresh, for scripts and management commands.
+        """
+        return run_sync(self.arefresh, source, department)
+
+    def _store(self, source, department, now, data):
+        counts = None
+        try:
+            if data:
+                if source == "research":
+                    counts = self.ingest_research(department, data)
+                elif source == "courses":
+                    counts = self.ingest_courses(department, data)
+                else:
+                    counts = self.ingest_events(data)
+            else:
+                logger.warning(f"No {source} data for {department or 'all'}")
+        except Exception as e:
+            logger.error(f"Error storing {source} {department or ''}: {e}")
+            self._record_refresh(source, department, now, None, error=e)
+            return None
+        self._record_refresh(source, department, now, counts)
+        return counts
+
+    def _record_refresh(self, source, department, now, counts, error=None):
+        refresh, _ = SourceRefresh.objects.get_or_create(source=source, department=department or "")
+        refresh.attempted_at = now
+        refresh.error = str(error) if error else ""
+        if error:
+            refresh.status = "failed"
+        elif counts is None:
+            refresh.status = "empty"
+        else:
+            refresh.status = "succeeded"
+            refresh.refreshed_at = now
+            refresh.counts = counts
+        refresh.save()
+        if counts is not None:
+            cache.delete(api_cache_key(source, department))
+
+    async def arefresh_all(self):
+        """
+        Refreshes every configured source and department, one at a time over the shared client.
+
+        Returns:
+            Counts keyed by "source:department".
+        """
+        results = {}
+        for department in settings.RESEARCH_DEPARTMENTS:
+            results[f"research:{department}"] = await self.arefresh("research", department)
+        for department in settings.COURSE_DEPARTMENTS:
+            results[f"courses:{department}"] = await self.arefresh("courses", department)
+        results["events"] = await self.arefresh("events")
+        return results
+
+    def refresh_all(self):
+        return run_sync(self.arefresh_all)
+
+    def process_research_data(self, departments=None):
+        """
+        Ingests research data for every configured department.
 
+        Args:
+            departments: Department codes to ingest; defaults to settings.RESEARCH_DEPARTMENTS.
+
+        Returns:
+            Inserted, updated and unchanged row counts per department.
+        """
+        async def refresh_departments():
+            results = {}
+            for department in departments or settings.RESEARCH_DEPARTMENTS:
+                counts = await self.arefresh("research", department)
+                if counts is not None:
+                    results[department] = counts
+            return results
+
+        return run_sync(refresh_departments)
+
+    def ingest_research(self, department, research_data):
+        """
+        Upserts one department's professors in a single transaction, matched on src_url.
+
+        Returns:
+            Counts of inserted, updated and unchanged rows.
+        """
+        rows = []
+        terms = {}
         for item in research_data:
-            Research.objects.create(
-                professor_name=item["name"],
+            if not item.get("src_url"):
+                continue
+            terms[item["src_url"]] = split_interests(item.get("research_interest"))
+            research_interest = item.get("research_interest") or ""
+            if isinstance(research_interest, list):
+                research_interest = ", ".join(research_interest)
+            rows.append(Research(
+                professor_name=item.get("name") or "",
                 department=department,
-                website=item["website"],
-                research_interest=item["research_interest"],
-                src_url=item["src_url"])
-    
+                website=item.get("website") or "",
+                research_interest=research_interest,
+                src_url=item["src_url"],
+            ))
+        with transaction.atomic():
+            counts = self._upsert(Research, rows, ["src_url"], RESEARCH_UPDATE_FIELDS)
+            ids = dict(Research.objects.filter(src_url__in=terms).values_list("src_url", "id"))
+            link_interests({research_id: terms[src_url] for src_url, research_id in ids.items()})
+            refresh_interest_counts(department)
+        try:
+            update_match_index(list(ids.values()))
+        except Exception as e:
+            # The rows are stored; the index catches up on the next ingest
+            logger.error(f"Failed to update the match index for {department}: {e}")
+        logger.info(f"Ingested research for {department}: {counts}")
+        return counts
+
+    def ingest_courses(self, department, course_data):
+        """
+        Upserts one department's courses in a single transaction, matched on code and name.
+        """
+        rows = [
+            Course(
+                department=department,
+                course_code=item.get("course_code") or "",
+                course_name=item["course_name"],
+                course_description=item.get("course_description") or "",
+                prereqs=item.get("prereqs") or "",
+                credits=item.get("credits", -1),
+            )
+            for item in course_data if item.get("course_name")
+        ]
+        counts = self._upsert(Course, rows, ["department", "course_code", "course_name"], COURSE_UPDATE_FIELDS)
+        logger.info(f"Ingested courses for {department}: {counts}")
+        return counts
+
+    def ingest_events(self, event_data):
+        """
+        Upserts events in a single transaction, matched on page_url.
+        """
+        rows = [
+            Event(event_name=item["event_name"], date=item.get("date") or "", page_url=item["page_url"])
+            for item in event_data if item.get("page_url") and item.get("event_name")
+        ]
+        counts = self._upsert(Event, rows, ["page_url"], EVENT_UPDATE_FIELDS)
+        logger.info(f"Ingested events: {counts}")
+        return counts
+
+    def _upsert(self, model, rows, unique_fields, update_fields):
+        """
+        Writes new and changed rows with bulk_create(update_conflicts=True) in one transaction.
+
+        Rows are diffed against what is stored (by unique_fields) first, so unchanged rows are not
+        written and the counts are exact. The conflict clause still makes a concurrent ingest of the
+        same rows update rather than fail.
+
+        Returns:
+            Counts of inserted, updated and unchanged rows.
+        """
+        def key(values):
+            return tuple(values[field] for field in unique_fields)
+
+        # Later duplicates in one payload win, as sequential upserts would
+        incoming = {key({field: getattr(row, field) for field in unique_fields}): row for row in rows}
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        with transaction.atomic():
+            existing = {}
+            filter_field = unique_fields[-1]
+            candidates = model.objects.filter(**{f"{filter_field}__in": {k[-1] for k in incoming}})
+            for values in candidates.values(*unique_fields, *update_fields):
+                existing[key(values)] = values
+
+            to_write = []
+            for row_key, row in incoming.items():
+                current = existing.get(row_key)
+                if current is None:
+                    counts["inserted"] += 1
+                elif any(current[field] != getattr(row, field) for field in update_fields):
+                    counts["updated"] += 1
+                else:
+                    counts["unchanged"] += 1
+                    continue
+                to_write.append(row)
+
+            model.objects.bulk_create(
+                to_write,
+                batch_size=settings.INGEST_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=update_fields,
+            )
+        return counts
+
     def test_connection(self):
-        return self.microservice_client.test_connection()
+        return run_sync(self.microservice_client.test_connection)
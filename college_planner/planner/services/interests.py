@@ -0,0 +1,140 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import difflib
+import logging
+import re
+
+from planner.models import DepartmentInterest, Interest, Research
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Abbreviations and alternate names, mapped to one canonical interest (keys and values normalized)
+SYNONYMS = {
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "hci": "human computer interaction",
+    "human computer interface": "human computer interaction",
+    "cybersecurity": "computer security",
+    "cyber security": "computer security",
+}
+
+# difflib ratio above which a new term is treated as a spelling variant of a known interest
+FUZZY_CUTOFF = 0.92
+
+# Words whose trailing "s" is not a plural
+_NOT_PLURAL = ("ss", "us", "is", "ics")
+
+
+def _singular(word):
+    if len(word) <= 3 or word.endswith(_NOT_PLURAL):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def normalize(term):
+    """
+    Lowercases a term, turns punctuation into spaces and makes every word singular:
+    "Neural-Networks." -> "neural network".
+    """
+    words = re.sub(r"[^\w\s]|_", " ", term.lower()).split()
+    normalized = " ".join(_singular(word) for word in words)
+    return SYNONYMS.get(normalized, normalized)
+
+
+def split_interests(research_interest):
+    """
+    Individual terms of a research_interest value: the extracted list, or the string it was
+    stored as (comma or semicolon separated).
+    """
+    if isinstance(research_interest, str):
+        research_interest = re.split(r"[,;\n]", research_interest)
+    return [term.strip() for term in research_interest or [] if term and term.strip()]
+
+
+class Canonicalizer:
+    """
+    Maps raw terms to canonical interest names: normalized, synonyms applied, and near-duplicate
+    spellings folded into the closest interest already known.
+    """
+
+    def __init__(self, known_names):
+        self.known = set(known_names)
+        self._ordered = sorted(self.known)
+        self._cache = {}
+
+    def canonical(self, term):
+        key = normalize(term)
+        if not key:
+            return None
+        if key in self._cache:
+            return self._cache[key]
+        name = key
+        if key not in self.known:
+            match = difflib.get_close_matches(key, self._ordered, n=1, cutoff=FUZZY_CUTOFF)
+            if match:
+                name = match[0]
+            else:
+                self.known.add(key)
+                self._ordered.append(key)
+        self._cache[key] = name
+        return name
+
+
+def link_interests(research_ids_by_terms):
+    """
+    Replaces the interest links of the given professors.
+
+    Args:
+        research_ids_by_terms: Research id -> raw interest terms.
+    """
+    canonicalizer = Canonicalizer(Interest.objects.values_list("name", flat=True))
+    names_by_research = {
+        research_id: {name for name in map(canonicalizer.canonical, terms) if name}
+        for research_id, terms in research_ids_by_terms.items()
+    }
+    names = set().union(*names_by_research.values()) if names_by_research else set()
+    Interest.objects.bulk_create([Interest(name=name) for name in names], ignore_conflicts=True)
+    interest_ids = dict(Interest.objects.filter(name__in=names).values_list("name", "id"))
+
+    Through = Research.interests.through
+    Through.objects.filter(research_id__in=names_by_research).delete()
+    Through.objects.bulk_create([
+        Through(research_id=research_id, interest_id=interest_ids[name])
+        for research_id, research_names in names_by_research.items()
+        for name in research_names
+    ], batch_size=1000)
+
+
+def refresh_interest_counts(department):
+    """
+    Recomputes the precomputed facet counts after a department has been ingested: every
+    interest's professor_count, and the department's DepartmentInterest rows.
+    """
+    Through = Research.interests.through
+    per_interest = (
+        Through.objects.filter(interest_id=OuterRef("pk")).values("interest_id")
+        .annotate(professors=Count("research_id")).values("professors")
+    )
+    Interest.objects.update(
+        professor_count=Coalesce(Subquery(per_interest, output_field=IntegerField()), 0),
+    )
+
+    counts = (
+        Through.objects.filter(research__department=department).values("interest_id")
+        .annotate(professors=Count("research_id"))
+    )
+    DepartmentInterest.objects.filter(department=department).delete()
+    DepartmentInterest.objects.bulk_create([
+        DepartmentInterest(department=department, interest_id=row["interest_id"], professor_count=row["professors"])
+        for row in counts
+    ], batch_size=1000)
+    logger.info(f"Refreshed interest facets for {department}")
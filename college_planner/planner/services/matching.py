@@ -0,0 +1,294 @@
+from django.conf import settings
+import logging
+import os
+import re
+import tempfile
+import threading
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from planner.models import Course, Research
+from .interests import normalize, split_interests
+from .search import tokenize
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Character trigrams let "robot" meet "robotics"; they count less than whole words
+CHAR_NGRAM_WEIGHT = 0.25
+# Course descriptions are long and generic next to a stated interest
+COURSE_WEIGHT = 0.5
+
+
+def _features(texts):
+    features = {}
+    for text in texts:
+        tokens = tokenize(text)
+        # Bigrams stay within one text, so separate interests don't run into each other
+        grams = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+        for gram in grams:
+            features[gram] = features.get(gram, 0.0) + 1.0
+        for token in tokens:
+            padded = f"#{token}#"
+            for i in range(len(padded) - 2):
+                features[padded[i:i + 3]] = features.get(padded[i:i + 3], 0.0) + CHAR_NGRAM_WEIGHT
+    return features
+
+
+def hashed_vector(texts, dimensions):
+    """
+    Sublinear term-frequency vector of the texts' words, word bigrams and character trigrams,
+    hashed into a fixed number of dimensions (so there is no vocabulary to maintain).
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature, count in _features(texts).items():
+        weight = 1.0 + np.log(count) if count > 1 else count
+        # crc32 rather than hash(): the index is shared between processes
+        vector[zlib.crc32(feature.encode()) % dimensions] += weight
+    return vector
+
+
+def professor_texts(research_interest, interest_names=()):
+    """
+    What a professor is matched on: their extracted interests plus the canonical interest names
+    they were linked to, so "ML" on a page matches "machine learning" in a query.
+    """
+    return [*split_interests(research_interest), *interest_names]
+
+
+class MatchIndex:
+    """
+    Hashed TF-IDF vectors of every professor, one row per professor in a float32 matrix.
+
+    Rows hold raw term frequencies; IDF is derived from the matrix whenever it changes, and folded
+    into the query instead of the rows, so re-vectorizing some professors never changes anyone
+    else's row. A query is then a single matrix-vector product divided by the precomputed row
+    norms.
+    """
+
+    def __init__(self, ids, departments, matrix):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.departments = np.asarray(departments, dtype=str)
+        self.matrix = np.asarray(matrix, dtype=np.float32)
+        self.dimensions = self.matrix.shape[1]
+        self._prepare()
+
+    @classmethod
+    def empty(cls, dimensions):
+        return cls([], [], np.zeros((0, dimensions), dtype=np.float32))
+
+    def _prepare(self):
+        self.rows = {int(research_id): row for row, research_id in enumerate(self.ids)}
+        document_frequency = np.count_nonzero(self.matrix, axis=0)
+        self.idf = (np.log((1 + len(self.ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        self.idf_squared = self.idf ** 2
+        self.norms = np.sqrt((self.matrix ** 2) @ self.idf_squared)
+        self.norms[self.norms == 0] = 1.0
+
+    def updated(self, vectors):
+        """
+        Returns a copy with professors' rows added or replaced; queries running on this index
+        are unaffected.
+
+        Args:
+            vectors: Research id -> (department, term-frequency vector).
+        """
+        ids, departments, matrix = list(self.ids), list(self.departments), self.matrix.copy()
+        new_rows = []
+        for research_id, (department, vector) in vectors.items():
+            row = self.rows.get(research_id)
+            if row is None:
+                ids.append(research_id)
+                departments.append(department)
+                new_rows.append(vector)
+            else:
+                departments[row] = department
+                matrix[row] = vector
+        if new_rows:
+            matrix = np.vstack([matrix, np.stack(new_rows)])
+        return MatchIndex(ids, departments, matrix)
+
+    def query(self, vector, k=10, department=None):
+        """
+        Top-k professors by cosine similarity of their TF-IDF vectors to the query's.
+
+        Returns:
+            (research id, score) pairs, best first, leaving out professors with no overlap.
+        """
+        if not len(self.ids) or not vector.any():
+            return []
+        weighted = vector * self.idf_squared
+        query_norm = np.sqrt(vector @ weighted)
+        scores = (self.matrix @ weighted) / (self.norms * query_norm)
+        if department:
+            scores = np.where(self.departments == department, scores, 0.0)
+        k = min(k, len(scores))
+        # Every row scoring at least the k-th best, so ties at the cut don't depend on partitioning
+        kth = np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(-scores <= kth)
+        # Best first; equal scores in row order (earliest indexed first)
+        top = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+        return [(int(self.ids[row]), round(float(scores[row]), 4)) for row in top if scores[row] > 0]
+
+    def save(self, path):
+        # Written next to the target and renamed, so readers never load a partial file
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, ids=self.ids, departments=self.departments, matrix=self.matrix)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["ids"], data["departments"], data["matrix"])
+
+
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+@contextmanager
+def _index_file_lock(path):
+    """
+    Serializes updates of the index file across processes (web workers, the scheduler and the
+    management command) with an flock on a sidecar file. Without fcntl (Windows) only threads
+    of this process are serialized.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _file_version(path):
+    # os.replace gives every save a new inode, so this changes even within one mtime tick
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def _vectors_for(queryset):
+    dimensions = settings.PLANNER_MATCH_DIMENSIONS
+    vectors = {}
+    for research in queryset.prefetch_related("interests"):
+        texts = professor_texts(research.research_interest, [interest.name for interest in research.interests.all()])
+        vectors[research.id] = (research.department, hashed_vector(texts, dimensions))
+    return vectors
+
+
+def _save(index, path):
+    global _index, _index_version
+    index.save(path)
+    _index, _index_version = index, _file_version(path)
+
+
+def _latest(path):
+    """
+    The newest index on disk, or in memory if the file hasn't changed. Called with _lock held.
+    """
+    global _index, _index_version
+    version = _file_version(path)
+    if version is not None and version != _index_version:
+        _index, _index_version = MatchIndex.load(path), version
+    if _index is not None and _index.dimensions != settings.PLANNER_MATCH_DIMENSIONS:
+        _index = None
+    return _index
+
+
+def get_match_index():
+    """
+    Returns the process's index, reloading it when another process has saved a newer one, or
+    building it from the database if none has been saved (or it was saved with other dimensions).
+    """
+    path = settings.PLANNER_MATCH_INDEX_PATH
+    with _lock:
+        index = _latest(path)
+        if index is not None:
+            return index
+        with _index_file_lock(path):
+            # Another process may have built it while we waited
+            index = _latest(path)
+            if index is None:
+                index = MatchIndex.empty(settings.PLANNER_MATCH_DIMENSIONS).updated(_vectors_for(Research.objects.all()))
+                _save(index, path)
+                logger.info(f"Built match index over {len(index.ids)} professors")
+        return index
+
+
+def update_match_index(research_ids):
+    """
+    Re-vectorizes the given professors after an ingest and saves the index.
+
+    Reloading the latest file, updating it and saving happen under one lock shared by every
+    process, so concurrent ingests of different departments don't overwrite each other's rows.
+    """
+    path = settings.PLANNER_MATCH_INDEX_PATH
+    vectors = _vectors_for(Research.objects.filter(id__in=research_ids))
+    with _lock, _index_file_lock(path):
+        index = _latest(path)
+        if index is None:
+            # Nothing saved yet: build everything, which includes these professors
+            index = MatchIndex.empty(settings.PLANNER_MATCH_DIMENSIONS).updated(_vectors_for(Research.objects.all()))
+        else:
+            index = index.updated(vectors)
+        _save(index, path)
+    logger.info(f"Updated match index with {len(research_ids)} professors")
+
+
+def normalize_course_code(code):
+    """
+    Writes a course code the way the catalog does: "csci-141" and "CSCI141" -> "CSCI 141".
+    """
+    code = " ".join(code.upper().replace("-", " ").split())
+    return re.sub(r"^([A-Z]+)(?=\d)", r"\1 ", code)
+
+
+def match_professors(interests=(), course_codes=(), k=10, department=None):
+    """
+    Ranks professors against a student's interests and/or the courses they have taken.
+
+    Interests are matched as given and in canonical form; courses contribute their names and
+    descriptions, at lower weight.
+
+    Returns:
+        Matched (research id, score) pairs, best first, and the course codes that weren't found.
+    """
+    dimensions = settings.PLANNER_MATCH_DIMENSIONS
+    query = np.zeros(dimensions, dtype=np.float32)
+    if interests:
+        query += hashed_vector([*interests, *map(normalize, interests)], dimensions)
+
+    codes = [normalize_course_code(code) for code in course_codes]
+    courses = Course.objects.filter(course_code__in=codes).values("course_code", "course_name", "course_description")
+    found = set()
+    course_text = []
+    for course in courses:
+        found.add(course["course_code"])
+        course_text += [course["course_name"], course["course_description"]]
+    if course_text:
+        query += COURSE_WEIGHT * hashed_vector(course_text, dimensions)
+
+    unknown = [code for code in codes if code not in found]
+    return get_match_index().query(query, k, department), unknown
@@ -1,43 +1,93 @@
+from asgiref.sync import async_to_sync
 from django.conf import settings
+import asyncio
 import httpx
 import logging
+import weakref
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Extractions crawl and run the LLM before answering; everything else should answer quickly
+TIMEOUTS = {
+    "extract": httpx.Timeout(360, connect=5),
+    "health": httpx.Timeout(5),
+}
+
+# One pooled client per event loop: under ASGI that is one per process, kept for its lifetime, as is
+# the background refresh loop's. Sync callers get a loop per call and close theirs with run_sync.
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared keep-alive client for the running event loop, creating it on first use.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=settings.MICROSERVICE_URL,
+            limits=httpx.Limits(
+                max_connections=settings.MICROSERVICE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.MICROSERVICE_MAX_CONNECTIONS,
+            ),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def aclose_http_client():
+    """
+    Closes the running loop's client, if it has one.
+    """
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def run_sync(async_function, *args):
+    """
+    Runs an async function from sync code (scripts and management commands). async_to_sync gives
+    every call an event loop of its own, so that loop's client is closed before the loop goes away.
+    """
+    async def run():
+        try:
+            return await async_function(*args)
+        finally:
+            await aclose_http_client()
+
+    return async_to_sync(run)()
+
+
 class MicroserviceClient:
     def __init__(self):
         self.base_url = settings.MICROSERVICE_URL
-        self.timeout = 360
 
-    def get_research(self, department_code: str):
-        url = f"{self.base_url}/extract/research/{department_code}"
-        response = httpx.get(url, timeout=self.timeout)
+    async def get_research(self, department_code: str):
+        response = await get_http_client().get(f"/extract/research/{department_code}", timeout=TIMEOUTS["extract"])
         # response.raise_for_status()
         return response.json()
-    
-    def get_course(self, department_code: str):
-        url = f"{self.base_url}/extract/courses/{department_code}"
+
+    async def get_course(self, department_code: str):
         try:
-            response = httpx.get(url, timeout=self.timeout)
+            response = await get_http_client().get(f"/extract/courses/{department_code}", timeout=TIMEOUTS["extract"])
             response.raise_for_status()
             return response.json()
         except httpx.HTTPError as e:
             logger.error(f"Error occurred while getting course data: {e}")
 
-    def get_events(self):
-        url = f"{self.base_url}/extract/events"
+    async def get_events(self):
         try:
-            response = httpx.get(url, timeout=self.timeout)
+            response = await get_http_client().get("/extract/events", timeout=TIMEOUTS["extract"])
             response.raise_for_status()
             return response.json()
         except httpx.HTTPError as e:
             logger.error(f"Error occured while getting events {e}")
-    
 
-    def test_connection(self):
-        url = f"{self.base_url}/health"
-        response = httpx.get(url)
+
+    async def test_connection(self):
+        response = await get_http_client().get("/health", timeout=TIMEOUTS["health"])
         # response.raise_for_status()
         if response.status_code != 200:
             return False
@@ -0,0 +1,83 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+import asyncio
+import logging
+import threading
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_in_progress = set()
+_lock = threading.Lock()
+_loop = None
+_scheduler = None
+
+
+def _get_loop():
+    """
+    Returns the event loop that runs every background refresh, starting its thread on first use.
+    Keeping the refreshes on one loop lets them share one pooled microservice client.
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="planner-refresh", daemon=True).start()
+        return _loop
+
+
+async def _run_refresh(source, department):
+    from .data_processor import DataProcessor
+    try:
+        await DataProcessor().arefresh(source, department)
+    finally:
+        # Threads outside the request cycle have to release their own connections
+        await sync_to_async(close_old_connections)()
+        with _lock:
+            _in_progress.discard((source, department))
+
+
+def refresh_in_background(source, department=None):
+    """
+    Starts a refresh of one source/department on the background loop, unless one is already running.
+
+    Returns:
+        True if a refresh was started.
+    """
+    key = (source, department)
+    with _lock:
+        if key in _in_progress:
+            return False
+        _in_progress.add(key)
+    asyncio.run_coroutine_threadsafe(_run_refresh(source, department), _get_loop())
+    return True
+
+
+def is_refreshing(source, department=None):
+    with _lock:
+        return (source, department) in _in_progress
+
+
+async def _refresh_loop(interval):
+    from .data_processor import DataProcessor
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await DataProcessor().arefresh_all()
+        except Exception as e:
+            logger.error(f"Scheduled refresh failed: {e}")
+        finally:
+            await sync_to_async(close_old_connections)()
+
+
+def start_scheduler():
+    """
+    Schedules a refresh of every source every PLANNER_REFRESH_INTERVAL seconds.
+    """
+    global _scheduler
+    if _scheduler is None:
+        interval = settings.PLANNER_REFRESH_INTERVAL
+        _scheduler = asyncio.run_coroutine_threadsafe(_refresh_loop(interval), _get_loop())
+        logger.info(f"Refreshing planner data every {interval}s")
+    return _scheduler
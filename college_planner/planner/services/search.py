@@ -0,0 +1,132 @@
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Max
+from django.db.models.expressions import RawSQL
+import logging
+import math
+import re
+import threading
+from collections import defaultdict
+
+from planner.models import Research, SourceRefresh
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ["professor_name", "department", "website", "research_interest", "src_url"]
+
+# Matches the weights of the Postgres search_vector column (see migration 0005)
+FIELD_WEIGHTS = {"research_interest": 1.0, "professor_name": 0.4}
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it", "of", "on",
+    "or", "the", "to", "with",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _stem(token):
+    # Light suffix stripping so "networks" finds "network", roughly as the english tsvector config does
+    for suffix, replacement in (("ies", "y"), ("sses", "ss"), ("ing", ""), ("s", "")):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3 and not token.endswith("ss"):
+            return token[: -len(suffix)] + replacement
+    return token
+
+
+def tokenize(text):
+    return [_stem(token) for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+class InvertedIndex:
+    """
+    In-memory full-text index over research rows, used when the database has no full-text search
+    (SQLite in development).
+
+    Postings map each term to the rows containing it and its weighted frequency there. Every
+    query term must match, and rows are ranked by BM25.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, rows):
+        self.rows = {}
+        self.postings = defaultdict(dict)
+        self.lengths = {}
+        for row in rows:
+            self.rows[row["id"]] = row
+            length = 0.0
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in tokenize(row[field]):
+                    self.postings[term][row["id"]] = self.postings[term].get(row["id"], 0.0) + weight
+                    length += weight
+            self.lengths[row["id"]] = length
+        self.average_length = (sum(self.lengths.values()) / len(self.lengths)) if self.lengths else 0.0
+
+    def search(self, query, department=None, limit=20):
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        # Intersect starting from the rarest term
+        postings = sorted((self.postings.get(term, {}) for term in terms), key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            matches &= posting.keys()
+        if department:
+            matches = {row_id for row_id in matches if self.rows[row_id]["department"] == department}
+
+        total = len(self.rows)
+        scores = {}
+        for posting in postings:
+            idf = math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for row_id in matches:
+                frequency = posting[row_id]
+                norm = 1 - self.b + self.b * self.lengths[row_id] / (self.average_length or 1)
+                scores[row_id] = scores.get(row_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+        ranked = sorted(matches, key=lambda row_id: (-scores[row_id], row_id))[:limit]
+        return [dict(self.rows[row_id], score=round(scores[row_id], 4)) for row_id in ranked]
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def _fallback_index():
+    """
+    Returns the process's inverted index, rebuilding it after research has been re-ingested.
+    """
+    global _index, _index_version
+    version = SourceRefresh.objects.filter(source="research").aggregate(latest=Max("refreshed_at"))["latest"]
+    with _index_lock:
+        if _index is None or version != _index_version:
+            _index = InvertedIndex(Research.objects.values("id", *SEARCH_FIELDS))
+            _index_version = version
+            logger.info(f"Built research search index over {len(_index.rows)} rows")
+        return _index
+
+
+def search_research(query, department=None, limit=20):
+    """
+    Ranked full-text search over professors' research interests and names.
+
+    On Postgres this uses the GIN-indexed search_vector column; elsewhere an in-process inverted
+    index. Quoted phrases, "or" and "-word" are understood on Postgres (websearch syntax); the
+    fallback requires every word.
+
+    Returns:
+        Matching rows, best first, each with a score.
+    """
+    if connection.vendor != "postgresql":
+        return _fallback_index().search(query, department, limit)
+
+    tsquery = "websearch_to_tsquery('english', %s)"
+    queryset = Research.objects.alias(
+        matches=RawSQL(f"search_vector @@ {tsquery}", [query], output_field=BooleanField()),
+    ).filter(matches=True).annotate(
+        score=RawSQL(f"ts_rank_cd(search_vector, {tsquery})", [query], output_field=FloatField()),
+    )
+    if department:
+        queryset = queryset.filter(department=department)
+    rows = queryset.order_by("-score", "id").values("id", *SEARCH_FIELDS, "score")[:limit]
+    return [dict(row, score=round(row["score"], 4)) for row in rows]
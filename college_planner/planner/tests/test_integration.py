@@ -1,3 +1,5 @@
+import asyncio
+
 from planner.services.data_processor import DataProcessor
 from planner.services.microservice_client import MicroserviceClient
 data_processor = DataProcessor()
@@ -6,4 +8,4 @@ print(data_processor.test_connection())
 
 microservice_client = MicroserviceClient()
 
-print(microservice_client.get_research("CSCI"))
\ No newline at end of file
+print(asyncio.run(microservice_client.get_research("CSCI")))
\ No newline at end of file
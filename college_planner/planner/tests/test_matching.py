@@ -0,0 +1,111 @@
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from planner.models import Course, Research
+from planner.services import matching
+from planner.services.matching import MatchIndex, match_professors, normalize_course_code
+
+DIMENSIONS = 256
+# One dimension per word, so index tests don't depend on hashing
+WORDS = ["machine", "learning", "computer", "networks", "statistics", "robotics", "optics", "poetry"]
+
+
+def vector(*texts):
+    result = np.zeros(DIMENSIONS, dtype=np.float32)
+    for word in " ".join(texts).split():
+        result[WORDS.index(word)] += 1.0
+    return result
+
+
+class MatchIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = MatchIndex.empty(DIMENSIONS).updated({
+            1: ("CSCI", vector("machine learning")),
+            2: ("CSCI", vector("computer networks")),
+            3: ("MATH", vector("machine learning", "statistics")),
+        })
+
+    def test_updated_replaces_rows_in_place_and_appends_new_ones(self):
+        updated = self.index.updated({
+            2: ("CSCI", vector("robotics")),
+            4: ("EECE", vector("computer networks")),
+        })
+        self.assertEqual(updated.ids.tolist(), [1, 2, 3, 4])
+        self.assertEqual(updated.departments.tolist(), ["CSCI", "CSCI", "MATH", "EECE"])
+        np.testing.assert_array_equal(updated.matrix[1], vector("robotics"))
+        self.assertEqual(updated.query(vector("computer networks"))[0][0], 4)
+        # The original index is left as it was, for queries already running on it
+        self.assertEqual(self.index.ids.tolist(), [1, 2, 3])
+        self.assertEqual(self.index.query(vector("computer networks"))[0][0], 2)
+
+    def test_query_ranks_by_similarity(self):
+        results = self.index.query(vector("machine learning"))
+        self.assertEqual([research_id for research_id, _ in results], [1, 3])
+        self.assertGreater(results[0][1], results[1][1])
+
+    def test_department_masks_other_rows(self):
+        self.assertEqual([research_id for research_id, _ in self.index.query(vector("machine learning"), department="MATH")], [3])
+        self.assertEqual(self.index.query(vector("statistics"), department="CSCI"), [])
+
+    def test_ties_keep_row_order(self):
+        index = MatchIndex.empty(DIMENSIONS).updated({
+            research_id: ("CSCI", vector("optics")) for research_id in [30, 10, 20, 40]
+        })
+        self.assertEqual([research_id for research_id, _ in index.query(vector("optics"))], [30, 10, 20, 40])
+        self.assertEqual([research_id for research_id, _ in index.query(vector("optics"), k=2)], [30, 10])
+
+    def test_no_overlap_and_empty_queries(self):
+        self.assertEqual(self.index.query(vector("poetry")), [])
+        self.assertEqual(self.index.query(np.zeros(DIMENSIONS, dtype=np.float32)), [])
+        self.assertEqual(MatchIndex.empty(DIMENSIONS).query(vector("machine learning")), [])
+
+
+class NormalizeCourseCodeTests(SimpleTestCase):
+    def test_formats_codes_like_the_catalog(self):
+        for code in ["CSCI 141", "csci 141", "csci-141", "CSCI141", "  csci   141 "]:
+            with self.subTest(code=code):
+                self.assertEqual(normalize_course_code(code), "CSCI 141")
+        self.assertEqual(normalize_course_code("math204l"), "MATH 204L")
+
+
+class MatchProfessorsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def professor(name, research_interest, department="CSCI"):
+            return Research.objects.create(professor_name=name, department=department, website="",
+                                           research_interest=research_interest, src_url=f"https://wwu.edu/{name}")
+
+        cls.robotics_professor = professor("robotics", "robotics, robot motion planning")
+        cls.database_professor = professor("databases", "databases, query optimization")
+        cls.math_professor = professor("math_robotics", "robotics", department="MATH")
+        Course.objects.create(department="CSCI", course_code="CSCI 497", course_name="Robotics",
+                              course_description="Robot kinematics and motion planning.")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(PLANNER_MATCH_INDEX_PATH=f"{directory.name}/match_index.npz",
+                                     PLANNER_MATCH_DIMENSIONS=DIMENSIONS)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Start from no index, so it is built from this test's rows
+        for name in ["_index", "_index_version"]:
+            patcher = mock.patch.object(matching, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_course_codes_are_normalized(self):
+        matches, unknown = match_professors(course_codes=["csci497", "csci-999"])
+        self.assertEqual(unknown, ["CSCI 999"])
+        ranked = [research_id for research_id, _ in matches]
+        self.assertEqual(ranked[0], self.robotics_professor.id)
+        # Shared character trigrams ("motion", "optimization") may give it a small score, never a better one
+        self.assertNotEqual(ranked[1], self.database_professor.id)
+
+    def test_interests_and_department(self):
+        matches, unknown = match_professors(interests=["Robotics"], department="MATH")
+        self.assertEqual(unknown, [])
+        self.assertEqual([research_id for research_id, _ in matches], [self.math_professor.id])
@@ -0,0 +1,26 @@
+from django.test import SimpleTestCase
+
+from planner.services.microservice_client import get_http_client, run_sync
+
+
+class RunSyncTests(SimpleTestCase):
+    def test_client_is_closed_with_its_loop(self):
+        clients = []
+
+        async def use_client(value):
+            clients.append(get_http_client())
+            return value
+
+        self.assertEqual(run_sync(use_client, "answer"), "answer")
+        self.assertTrue(clients[0].is_closed)
+
+    def test_client_is_closed_when_the_call_fails(self):
+        clients = []
+
+        async def fail():
+            clients.append(get_http_client())
+            raise ValueError("bad response")
+
+        with self.assertRaises(ValueError):
+            run_sync(fail)
+        self.assertTrue(clients[0].is_closed)
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase, TestCase
+
+from planner.models import Research
+from planner.services.pagination import (
+    InvalidQuery, decode_cursor, encode_cursor, keyset_page, parse_fields, parse_limit,
+)
+
+RESEARCH_FIELDS = {"name": "professor_name", "department": "department", "src_url": "src_url"}
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        created_at = datetime(2026, 10, 18, 14, 28, 3, 123456, tzinfo=timezone.utc)
+        cursor = encode_cursor(created_at, 42)
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor), (created_at, 42))
+
+    def test_rejects_malformed_cursors(self):
+        for cursor in ["not a cursor", encode_cursor(datetime.now(timezone.utc), 1)[:-4], "WzFd",
+                       # Valid base64 JSON, but the id is not an integer
+                       "WyIyMDI2LTEwLTE4VDE0OjI4OjAzKzAwOjAwIiwgIjQyIl0"]:
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidQuery):
+                decode_cursor(cursor)
+
+
+class ParseLimitTests(SimpleTestCase):
+    def test_default_and_maximum(self):
+        self.assertEqual(parse_limit(None, 100, 1000), 100)
+        self.assertEqual(parse_limit("", 100, 1000), 100)
+        self.assertEqual(parse_limit("25", 100, 1000), 25)
+        self.assertEqual(parse_limit("5000", 100, 1000), 1000)
+
+    def test_rejects_invalid_limits(self):
+        for value in ["0", "-1", "ten", "2.5"]:
+            with self.subTest(value=value), self.assertRaises(InvalidQuery):
+                parse_limit(value, 100, 1000)
+
+
+class ParseFieldsTests(SimpleTestCase):
+    def test_selects_requested_fields_in_order(self):
+        self.assertEqual(parse_fields(None, RESEARCH_FIELDS), ["name", "department", "src_url"])
+        self.assertEqual(parse_fields("src_url, name,src_url", RESEARCH_FIELDS), ["src_url", "name"])
+
+    def test_rejects_unknown_fields(self):
+        for value in ["name,email", ",", "professor_name"]:
+            with self.subTest(value=value), self.assertRaises(InvalidQuery):
+                parse_fields(value, RESEARCH_FIELDS)
+
+
+class KeysetPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ids = [
+            Research.objects.create(professor_name=f"Professor {i}", department="CSCI", website="",
+                                    research_interest="", src_url=f"https://cs.wwu.edu/p{i}").id
+            for i in range(5)
+        ]
+        # Rows ingested in one batch share created_at; the id breaks the tie
+        created_at = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+        Research.objects.filter(id__in=cls.ids[:4]).update(created_at=created_at)
+        Research.objects.filter(id=cls.ids[4]).update(created_at=created_at + timedelta(seconds=1))
+
+    async def read_all(self, limit):
+        fields = ["name", "src_url"]
+        pages, cursor = [], None
+        while True:
+            rows, cursor = await keyset_page(Research.objects.all(), RESEARCH_FIELDS, fields, limit, cursor)
+            pages.append([row["name"] for row in rows])
+            if cursor is None:
+                return pages
+
+    async def test_seeks_within_a_shared_created_at(self):
+        pages = await self.read_all(limit=2)
+        self.assertEqual(pages, [["Professor 0", "Professor 1"], ["Professor 2", "Professor 3"], ["Professor 4"]])
+
+    async def test_last_full_page_has_no_cursor(self):
+        rows, cursor = await keyset_page(Research.objects.all(), RESEARCH_FIELDS, ["name"], 5)
+        self.assertEqual(len(rows), 5)
+        self.assertIsNone(cursor)
+        self.assertEqual(list(rows[0]), ["name"])
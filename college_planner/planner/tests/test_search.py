@@ -0,0 +1,66 @@
+from django.test import SimpleTestCase
+
+from planner.services.search import InvertedIndex, _stem, tokenize
+
+
+def row(row_id, research_interest, professor_name="", department="CSCI"):
+    return {"id": row_id, "professor_name": professor_name, "department": department, "website": "",
+            "research_interest": research_interest, "src_url": f"https://wwu.edu/{row_id}"}
+
+
+class StemTests(SimpleTestCase):
+    def test_strips_plural_and_ing_suffixes(self):
+        self.assertEqual(_stem("networks"), "network")
+        self.assertEqual(_stem("studies"), "study")
+        self.assertEqual(_stem("learning"), "learn")
+
+    def test_keeps_short_and_double_s_words(self):
+        self.assertEqual(_stem("class"), "class")
+        self.assertEqual(_stem("gis"), "gis")
+        self.assertEqual(_stem("bring"), "bring")
+
+    def test_tokenize_drops_stopwords(self):
+        self.assertEqual(tokenize("Learning of Neural Networks and the Brain"), ["learn", "neural", "network", "brain"])
+
+
+class InvertedIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = InvertedIndex([
+            row(1, "machine learning, computer vision"),
+            row(2, "machine translation, compilers"),
+            row(3, "deep learning, neural networks", department="MATH"),
+            row(4, "robotics, machine learning for robot learning"),
+            row(5, "databases", professor_name="Ada Learning"),
+        ])
+
+    def ids(self, query, **kwargs):
+        return [result["id"] for result in self.index.search(query, **kwargs)]
+
+    def test_every_term_must_match(self):
+        self.assertEqual(sorted(self.ids("machine learning")), [1, 4])
+        self.assertEqual(self.ids("machine compilers"), [2])
+        self.assertEqual(self.ids("machine biology"), [])
+
+    def test_department_filter(self):
+        self.assertEqual(self.ids("learning", department="MATH"), [3])
+        self.assertEqual(self.ids("neural", department="CSCI"), [])
+
+    def test_query_terms_are_stemmed(self):
+        self.assertEqual(self.ids("network"), [3])
+        self.assertEqual(self.ids("Neural Networks"), [3])
+        self.assertEqual(self.ids("robots"), [4])
+
+    def test_ranked_by_bm25(self):
+        # Row 4 mentions learning twice; a name match counts less than an interest
+        self.assertEqual(self.ids("learning"), [4, 1, 3, 5])
+        scores = [result["score"] for result in self.index.search("learning")]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_ties_are_broken_by_id(self):
+        index = InvertedIndex([row(7, "optics"), row(6, "optics")])
+        self.assertEqual([result["id"] for result in index.search("optics")], [6, 7])
+
+    def test_limit_and_empty_queries(self):
+        self.assertEqual(len(self.index.search("learning", limit=2)), 2)
+        self.assertEqual(self.index.search("the of and"), [])
+        self.assertEqual(InvertedIndex([]).search("learning"), [])
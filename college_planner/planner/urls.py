@@ -6,7 +6,12 @@ app_name = 'planner'
 urlpatterns = [
     # Health check
     path('health/', views.health_check, name='health_check'),
+    # Before research/<department>/, which would otherwise take "search" as a department
+    path('research/search/', views.search_research_data, name='search_research_data'),
     path('research/<str:department>/', views.get_research_data, name='get_research_data'),
+    path('interests/', views.get_interest_facets, name='get_interest_facets'),
+    path('interests/<str:interest>/professors/', views.get_interest_professors, name='get_interest_professors'),
+    path('match/', views.match_professors_data, name='match_professors_data'),
     path('course/<str:department>/', views.get_course_data, name='get_course_data'),
     path('events/', views.get_event_data, name='get_event_data')
 
@@ -2,15 +2,27 @@ from django.shortcuts import render
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from .services.data_processor import DataProcessor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.db.models import F
+from .models import Course, DepartmentInterest, Event, Interest, Research, SourceRefresh
+from .services.data_processor import api_cache_key
+from .services.interests import normalize, split_interests
+from .services.matching import match_professors
+from .services.pagination import InvalidQuery, keyset_page, parse_fields, parse_limit
 from .services.microservice_client import MicroserviceClient
+from .services.refresh import is_refreshing, refresh_in_background
+from .services.search import search_research
+import hashlib
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 # Create your views here.
 @require_http_methods(["GET"])
-def health_check(request):
+async def health_check(request):
     """
     Health check endpoint for Django + microservice.
     
@@ -18,7 +30,7 @@ def health_check(request):
     """
     try:
         client = MicroserviceClient()
-        microservice_healthy = client.test_connection()
+        microservice_healthy = await client.test_connection()
         
         return JsonResponse({
             'django_status': 'healthy',
@@ -35,23 +47,152 @@ def health_check(request):
             'error': str(e)
         }, status=503)
 
+# Response field -> model field, per endpoint; ?fields= picks from these
+RESEARCH_FIELDS = {
+    'name': 'professor_name',
+    'website': 'website',
+    'research_interest': 'research_interest',
+    'src_url': 'src_url',
+}
+COURSE_FIELDS = {
+    'course_code': 'course_code',
+    'course_name': 'course_name',
+    'course_description': 'course_description',
+    'prereqs': 'prereqs',
+    'credits': 'credits',
+}
+EVENT_FIELDS = {
+    'event_name': 'event_name',
+    'date': 'date',
+    'page_url': 'page_url',
+}
+
+
+# Departments each source can be refreshed for; anything else is a 404, never a crawl
+SOURCE_DEPARTMENTS = {
+    'research': 'RESEARCH_DEPARTMENTS',
+    'courses': 'COURSE_DEPARTMENTS',
+}
+
+
+async def _refreshed_at(source, department):
+    """
+    When the source/department was last pulled from the microservice (ISO string), or None
+    along with its SourceRefresh row (None if it was never attempted).
+    Cached under the key that a refresh clears.
+    """
+    key = api_cache_key(source, department)
+    refreshed_at = await cache.aget(key)
+    if refreshed_at is None:
+        refresh = await SourceRefresh.objects.filter(source=source, department=department or "").afirst()
+        if refresh is None or refresh.refreshed_at is None:
+            return None, refresh
+        refreshed_at = refresh.refreshed_at.isoformat()
+        await cache.aset(key, refreshed_at, settings.PLANNER_CACHE_TIMEOUT)
+    return refreshed_at, None
+
+
+def _retry_in(refresh):
+    """
+    Seconds until a source whose last refresh failed (or returned nothing) may be retried from a
+    page view, or 0 if it may be now.
+    """
+    if refresh is None or refresh.status not in ('failed', 'empty') or refresh.attempted_at is None:
+        return 0
+    elapsed = (timezone.now() - refresh.attempted_at).total_seconds()
+    return max(0, int(settings.PLANNER_REFRESH_RETRY_SECONDS - elapsed))
+
+
+async def _cached_response(request, source, department, queryset, available):
+    """
+    Serves one page of rows from the planner tables through the Django cache.
+
+    Query parameters:
+        limit: Rows per page (default PLANNER_PAGE_SIZE, at most PLANNER_MAX_PAGE_SIZE)
+        cursor: next_cursor of the previous page
+        fields: Comma-separated fields to return (default all)
+
+    The payload carries refreshed_at, when the source/department was last pulled from the
+    microservice, and pages are cached per refresh so a refresh makes every cached page stale.
+    If the source has never been pulled, a background refresh is started and 202 is returned
+    with no data, so the page view never waits on a crawl. Only configured departments are
+    refreshed (others are a 404), and after a failed refresh page views wait
+    PLANNER_REFRESH_RETRY_SECONDS before starting another (503 with Retry-After until then).
+    """
+    try:
+        limit = parse_limit(request.GET.get('limit'), settings.PLANNER_PAGE_SIZE, settings.PLANNER_MAX_PAGE_SIZE)
+        fields = parse_fields(request.GET.get('fields'), available)
+    except InvalidQuery as e:
+        return JsonResponse({'status': 'error', 'error': str(e)}, status=400)
+    cursor = request.GET.get('cursor') or None
+    if source in SOURCE_DEPARTMENTS and department not in getattr(settings, SOURCE_DEPARTMENTS[source]):
+        return JsonResponse({
+            'status': 'error',
+            'department': department,
+            'error': f'Unknown department: {department}'
+        }, status=404)
+
+    refreshed_at, refresh = await _refreshed_at(source, department)
+    if refreshed_at is None:
+        retry_in = _retry_in(refresh)
+        if retry_in:
+            payload = {
+                'status': 'error',
+                'error': f'Last refresh {refresh.status}: {refresh.error or "no data"}',
+                'refreshed_at': None,
+                'refreshing': is_refreshing(source, department),
+            }
+            if department:
+                payload['department'] = department
+            response = JsonResponse(payload, status=503)
+            response['Retry-After'] = str(retry_in)
+            return response
+        refresh_in_background(source, department)
+        payload = {
+            'status': 'pending',
+            'count': 0,
+            'data': [],
+            'next_cursor': None,
+            'refreshed_at': None,
+            'refreshing': True,
+        }
+        if department:
+            payload['department'] = department
+        return JsonResponse(payload, status=202)
+
+    params = hashlib.sha256(f"{refreshed_at}|{limit}|{cursor}|{','.join(fields)}".encode()).hexdigest()
+    page_key = f"{api_cache_key(source, department)}:{params}"
+    payload = await cache.aget(page_key)
+    if payload is None:
+        try:
+            data, next_cursor = await keyset_page(queryset, available, fields, limit, cursor)
+        except InvalidQuery as e:
+            return JsonResponse({'status': 'error', 'error': str(e)}, status=400)
+        payload = {
+            'status': 'success',
+            'count': len(data),
+            'data': data,
+            'next_cursor': next_cursor,
+            'refreshed_at': refreshed_at,
+        }
+        if department:
+            payload['department'] = department
+        await cache.aset(page_key, payload, settings.PLANNER_CACHE_TIMEOUT)
+    payload = dict(payload, refreshing=is_refreshing(source, department))
+    return JsonResponse(payload)
+
+
 @require_http_methods(["GET"])
-def get_research_data(request, department):
+async def get_research_data(request, department):
     """
     Get research data for a given department.
     
-    GET /api/research/
+    GET /api/research/<department>/?limit=&cursor=&fields=
     """
     try:
-        client = MicroserviceClient()
-        research_data = client.get_research(department)
-        return JsonResponse({
-            'status': 'success',
-            'department': department,
-            'count': len(research_data),
-            'data': research_data
-        })
-        
+        queryset = Research.objects.filter(department=department)
+        return await _cached_response(request, 'research', department, queryset, RESEARCH_FIELDS)
+
     except Exception as e:
         logger.error(f"Error getting research data for {department}: {e}")
         return JsonResponse({
@@ -61,53 +202,202 @@ def get_research_data(request, department):
         }, status=500)
     
 @require_http_methods(["GET"])
-def get_course_data(request, department):
+async def search_research_data(request):
     """
-    Get course data for a given department.
-    
-    GET /api/course/
+    Ranked full-text search over research interests across departments.
+
+    GET /api/research/search/?q=machine learning&department=&limit=
     """
+    query = request.GET.get('q', '').strip()
+    department = request.GET.get('department') or None
+    try:
+        limit = parse_limit(request.GET.get('limit'), settings.PLANNER_SEARCH_LIMIT, settings.PLANNER_MAX_PAGE_SIZE)
+    except InvalidQuery as e:
+        return JsonResponse({'status': 'error', 'error': str(e)}, status=400)
+    if not query:
+        return JsonResponse({'status': 'error', 'error': 'Missing query parameter: q'}, status=400)
 
     try:
-        client = MicroserviceClient()
-        course_data = client.get_course(department)
+        results = await sync_to_async(search_research)(query, department, limit)
+        data = [
+            {
+                'name': row['professor_name'],
+                'department': row['department'],
+                'website': row['website'],
+                'research_interest': row['research_interest'],
+                'src_url': row['src_url'],
+                'score': row['score'],
+            }
+            for row in results
+        ]
         return JsonResponse({
             'status': 'success',
-            'department': department,
-            'count': len(course_data),
-            'data': course_data
+            'query': query,
+            'count': len(data),
+            'data': data
         })
 
     except Exception as e:
-        logger.error(f"Error getting course data for {department}")
+        logger.error(f"Error searching research for {query!r}: {e}")
         return JsonResponse({
             'status': 'error',
-            'department': department,
-            'error': e
+            'query': query,
+            'error': str(e)
+        }, status=500)
+
+@require_http_methods(["GET"])
+async def get_interest_facets(request):
+    """
+    Research interests with how many professors share each, most shared first.
+
+    GET /api/interests/?department=&limit=
+    """
+    department = request.GET.get('department') or None
+    try:
+        limit = parse_limit(request.GET.get('limit'), settings.PLANNER_PAGE_SIZE, settings.PLANNER_MAX_PAGE_SIZE)
+    except InvalidQuery as e:
+        return JsonResponse({'status': 'error', 'error': str(e)}, status=400)
+
+    try:
+        if department:
+            queryset = DepartmentInterest.objects.filter(department=department).order_by(
+                '-professor_count', 'interest__name').values('professor_count', name=F('interest__name'))
+        else:
+            queryset = Interest.objects.filter(professor_count__gt=0).order_by(
+                '-professor_count', 'name').values('name', 'professor_count')
+        data = [row async for row in queryset[:limit]]
+        payload = {
+            'status': 'success',
+            'count': len(data),
+            'data': data
+        }
+        if department:
+            payload['department'] = department
+        return JsonResponse(payload)
+
+    except Exception as e:
+        logger.error(f"Error getting interest facets: {e}")
+        return JsonResponse({
+            'status': 'error',
+            'error': str(e)
+        }, status=500)
+
+@require_http_methods(["GET"])
+async def get_interest_professors(request, interest):
+    """
+    Professors who share a research interest. The interest is canonicalized first, so
+    "Neural-Networks" finds "neural network".
+
+    GET /api/interests/<interest>/professors/?department=&limit=
+    """
+    name = normalize(interest)
+    department = request.GET.get('department') or None
+    try:
+        limit = parse_limit(request.GET.get('limit'), settings.PLANNER_PAGE_SIZE, settings.PLANNER_MAX_PAGE_SIZE)
+    except InvalidQuery as e:
+        return JsonResponse({'status': 'error', 'error': str(e)}, status=400)
+
+    try:
+        queryset = Research.objects.filter(interests__name=name)
+        if department:
+            queryset = queryset.filter(department=department)
+        queryset = queryset.order_by('professor_name', 'id').values(
+            'department', 'website', 'research_interest', 'src_url', name=F('professor_name'))
+        data = [row async for row in queryset[:limit]]
+        return JsonResponse({
+            'status': 'success',
+            'interest': name,
+            'count': len(data),
+            'data': data
         })
-    
 
+    except Exception as e:
+        logger.error(f"Error getting professors for interest {name!r}: {e}")
+        return JsonResponse({
+            'status': 'error',
+            'interest': name,
+            'error': str(e)
+        }, status=500)
 
 @require_http_methods(["GET"])
-def get_event_data(request):
+async def match_professors_data(request):
     """
-    Get course data for a given department.
-    
-    GET /api/course/
+    Top-k professors whose research matches a student's interests and/or courses taken.
+    Both parameters take comma-separated values and may be repeated.
+
+    GET /api/match/?interests=machine learning,robotics&courses=CSCI 141&k=&department=
     """
+    interests = [term for value in request.GET.getlist('interests') for term in split_interests(value)]
+    courses = [code for value in request.GET.getlist('courses') for code in split_interests(value)]
+    department = request.GET.get('department') or None
+    try:
+        k = parse_limit(request.GET.get('k'), settings.PLANNER_SEARCH_LIMIT, settings.PLANNER_MAX_PAGE_SIZE)
+    except InvalidQuery as e:
+        return JsonResponse({'status': 'error', 'error': str(e)}, status=400)
+    if not interests and not courses:
+        return JsonResponse({'status': 'error', 'error': 'Give interests and/or courses'}, status=400)
 
     try:
-        client = MicroserviceClient()
-        event_data = client.get_events()
+        matches, unknown_courses = await sync_to_async(match_professors)(interests, courses, k, department)
+        scores = dict(matches)
+        professors = {
+            row['id']: row async for row in Research.objects.filter(id__in=scores).values(
+                'id', 'department', 'website', 'research_interest', 'src_url', name=F('professor_name'))
+        }
+        data = [
+            {**{key: value for key, value in professors[research_id].items() if key != 'id'}, 'score': score}
+            for research_id, score in matches if research_id in professors
+        ]
         return JsonResponse({
             'status': 'success',
-            'count': len(event_data),
-            'data': event_data
+            'count': len(data),
+            'data': data,
+            'unknown_courses': unknown_courses
         })
 
     except Exception as e:
-        logger.error(f"Error getting event data")
+        logger.error(f"Error matching professors: {e}")
+        return JsonResponse({
+            'status': 'error',
+            'error': str(e)
+        }, status=500)
+
+@require_http_methods(["GET"])
+async def get_course_data(request, department):
+    """
+    Get course data for a given department.
+    
+    GET /api/course/<department>/?limit=&cursor=&fields=
+    """
+
+    try:
+        queryset = Course.objects.filter(department=department)
+        return await _cached_response(request, 'courses', department, queryset, COURSE_FIELDS)
+
+    except Exception as e:
+        logger.error(f"Error getting course data for {department}: {e}")
         return JsonResponse({
             'status': 'error',
-            'error': e
-        })
\ No newline at end of file
+            'department': department,
+            'error': str(e)
+        }, status=500)
+    
+
+
+@require_http_methods(["GET"])
+async def get_event_data(request):
+    """
+    Get upcoming events.
+    
+    GET /api/events/?limit=&cursor=&fields=
+    """
+
+    try:
+        return await _cached_response(request, 'events', None, Event.objects.all(), EVENT_FIELDS)
+
+    except Exception as e:
+        logger.error(f"Error getting event data: {e}")
+        return JsonResponse({
+            'status': 'error',
+            'error': str(e)
+        }, status=500)
@@ -1,25 +1,86 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+from pydantic import BaseModel, Field
 import asyncio
+import json
 import logging
 import os
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Literal, Optional
 
 # Add the services directory to Python path to fix import issues
 
 # Import all extractor functions
-from research_extractor import extract_research_by_department
-from events_extractor import extract_events
-from courses_extractor import extract_course
-from shared_utils import csv_writer
+from research_extractor import extract_research_by_department, stream_research_by_department
+from events_extractor import extract_events, stream_events
+from courses_extractor import extract_course, stream_courses
+from shared_utils import csv_writer, tee_to_csv
+from shared_utils import config as shared_config
+from shared_utils import JobStore
+from shared_utils import ResponseCache
+from shared_utils import SingleFlight
+from shared_utils import close_http_client, get_run_stats, get_llm_cache_stats, get_rate_limiter_stats
+from shared_utils import start_browser_pool, close_browser_pool, get_browser_pool
+from shared_utils import init_db, close_db_pool
+from shared_utils import start_write_queue, close_write_queue, get_write_queue
+from research_extractor import config as research_config
+from events_extractor import config as events_config
+from courses_extractor import config as courses_config
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Background extraction jobs started by this worker, by job id
+_job_tasks: Dict[str, asyncio.Task] = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Opens the job store, response cache and database pool and launches the shared browser pool
+    on startup. Stops this worker's jobs and closes the browsers and connections on shutdown.
+    """
+    job_settings = shared_config.get_job_settings()
+    app.state.job_store = await asyncio.to_thread(JobStore, job_settings["path"], stale_after=job_settings["stale_after"])
+    await asyncio.to_thread(app.state.job_store.fail_stale)
+    heartbeat = asyncio.create_task(_heartbeat_jobs(app.state.job_store, job_settings["heartbeat_interval"]))
+    app.state.response_cache = await asyncio.to_thread(ResponseCache, **shared_config.get_response_cache_settings())
+
+    try:
+        await start_browser_pool(**shared_config.get_browser_pool_settings())
+    except Exception as e:
+        # Extractors fall back to launching their own browser when no pool is running
+        logger.error(f"Failed to start browser pool: {e}", exc_info=True)
+        await close_browser_pool()
+
+    try:
+        # Opens the connection pool and creates the schema if missing, not on every write
+        await asyncio.to_thread(init_db)
+    except Exception as e:
+        logger.error(f"Failed to initialize the database: {e}")
+    # Database writes are batched off the request path
+    start_write_queue()
+
+    try:
+        yield
+    finally:
+        heartbeat.cancel()
+        for task in list(_job_tasks.values()):
+            task.cancel()
+        await asyncio.gather(heartbeat, *_job_tasks.values(), return_exceptions=True)
+        await close_browser_pool()
+        await close_http_client()
+        await close_write_queue()
+        await asyncio.to_thread(close_db_pool)
+
+
 # Create the FastAPI app instance
 app = FastAPI(
     title="WWU Resource Extractor API",
     description="An API to scrape WWU resources from university websites.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 
@@ -37,6 +98,22 @@ async def health():
     """
     return {"message": "WWU Resource Extractor API is running", "status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Live state of shared resources for monitoring.
+    """
+    pool = get_browser_pool()
+    return {
+        "browser_pool": pool.stats() if pool else None,
+        "response_cache": await app.state.response_cache.stats(),
+        "extractions": _extraction_flights.stats(),
+        "incremental_crawl": get_run_stats(),
+        "llm_cache": await asyncio.to_thread(get_llm_cache_stats),
+        "llm_rate_limits": get_rate_limiter_stats(),
+        "write_queue": get_write_queue().stats() if get_write_queue() else None,
+    }
+
 @app.get("/logs")
 async def logs():
     """
@@ -47,18 +124,37 @@ async def logs():
     csv_writer(data, filename)
     return {"message": "WWU Resource Extractor API is running", "status": "logged"}    
 
+async def _cached_extraction(response: Response, source: str, department: Optional[str], refresh: bool) -> List[Dict]:
+    """
+    Serves an extraction from the response cache, loading it on a miss.
+
+    Sets X-Cache (hit, stale, miss or bypass) and Age headers on the response.
+    """
+    data, cache_status, age = await app.state.response_cache.get_or_load(
+        source, department, lambda: _extract_source(source, department), bypass=refresh
+    )
+    response.headers["X-Cache"] = cache_status
+    response.headers["Age"] = str(int(age))
+    return data
+
+
 @app.get("/extract/research/{department_code}")
-async def extract_research_endpoint(department_code: str):
+async def extract_research_endpoint(department_code: str, response: Response, refresh: bool = False,
+                                    wait_for_write: bool = False):
     """
     Extracts all faculty research information for a given department.
 
+    Responses are cached per department; stale entries are served while a refresh runs in the background.
+
     - **department_code**: The code for the department (e.g., 'CSCI').
+    - **refresh**: Bypass the cache and wait for a fresh extraction.
+    - **wait_for_write**: Return only once queued database writes have been flushed.
     """
     logger.info(f"Received request to extract research for department: {department_code}")
     try:
-        # Add timeout to prevent hanging
+        # Add timeout to prevent hanging. The extraction keeps running and fills the cache if this times out.
         research_data = await asyncio.wait_for(
-            extract_research_by_department(department_code, debug_mode=False, write_to_csv=True),
+            _cached_extraction(response, "research", department_code, refresh),
             timeout=300  # 5 minutes timeout
         )
 
@@ -67,6 +163,10 @@ async def extract_research_endpoint(department_code: str):
             # Raise an HTTPException, which FastAPI turns into a proper 404 response
             raise HTTPException(status_code=404, detail=f"No faculty research data found for department code: {department_code}")
 
+        write_queue = get_write_queue()
+        if wait_for_write and write_queue is not None:
+            await write_queue.flush()
+
         logger.info(f"Successfully extracted {len(research_data)} records for {department_code}.")
         return research_data
 
@@ -84,18 +184,15 @@ async def extract_research_endpoint(department_code: str):
 
 
 @app.get("/extract/events")
-async def extract_events_endpoint():
+async def extract_events_endpoint(response: Response, refresh: bool = False):
     """
     Extracts all events from the website.
+
+    - **refresh**: Bypass the cache and wait for a fresh extraction.
     """
     logger.info("Received request to extract events")
     try:
-        from events_extractor.config import get_base_url
-        # events = await asyncio.wait_for(
-        #     extract_events(get_base_url(), debug_mode=False),
-        #     timeout=600  # 10 minutes timeout (events can take longer)
-        # )
-        events = await extract_events(get_base_url(), debug_mode=True)
+        events = await _cached_extraction(response, "events", None, refresh)
         if not events:
             logger.warning("No events found")
             raise HTTPException(status_code=404, detail="No events found")
@@ -111,14 +208,15 @@ async def extract_events_endpoint():
 
 
 @app.get("/extract/courses/{department_code}")
-async def exract_courses_endpoint(department_code: str):
+async def exract_courses_endpoint(department_code: str, response: Response, refresh: bool = False):
     """
     API endpoint to extract course information for a given department.
+
+    - **refresh**: Bypass the cache and wait for a fresh extraction.
     """
     logger.info(f"Received request to extract courses for department: {department_code}")
     try:
-        courses = await extract_course(department_code, debug_mode=False)
-        print(type(courses[0]))
+        courses = await _cached_extraction(response, "courses", department_code, refresh)
         if not courses:
             logger.warning("No courses found")
             raise HTTPException(status_code=404, detail="No courses found for the specified department")
@@ -136,20 +234,212 @@ async def exract_courses_endpoint(department_code: str):
         raise HTTPException(status_code=500, detail="An internal server error occurred during course scraping.")
 
 
-@app.get("/extract/all")
-async def extract_all():
+def _format_stream_item(kind: str, payload: Dict[str, Any], stream_format: str) -> str:
     """
-    Extracts all data from all sources. This is the main endpoint for scheduled crawlers.
+    Serializes a streamed record or the summary trailer as an NDJSON line or an SSE event.
+    """
+    if stream_format == "sse":
+        return f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+    if kind == "record":
+        return json.dumps({"type": kind, "data": payload}) + "\n"
+    return json.dumps({"type": kind, **payload}) + "\n"
+
+
+def _stream_extraction(source: str, department: Optional[str], records: AsyncIterator[Dict],
+                       stream_format: str) -> StreamingResponse:
+    """
+    Streams records to the client as they are extracted, followed by a summary trailer.
+
+    Records are written as soon as they arrive and are not accumulated. If the client disconnects,
+    the generator is closed and outstanding crawls and LLM calls are cancelled.
+    """
+    async def body():
+        start = time.perf_counter()
+        count = 0
+        summary = {"source": source, "department": department, "status": "complete"}
+        try:
+            async for record in records:
+                count += 1
+                yield _format_stream_item("record", record, stream_format)
+        except Exception as e:
+            logger.error(f"Streaming {source} extraction failed for {department or source}: {e}", exc_info=True)
+            summary["status"] = "error"
+            summary["error"] = str(e)
+        summary["count"] = count
+        summary["duration_seconds"] = round(time.perf_counter() - start, 2)
+        logger.info(f"Streamed {count} {source} records for {department or source} in {summary['duration_seconds']}s")
+        yield _format_stream_item("summary", summary, stream_format)
+
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    # Disable proxy buffering so each record reaches the client immediately
+    return StreamingResponse(body(), media_type=media_type, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def _validate_department(source: str, department: Optional[str]):
+    """
+    Raises a 400 error if the department is not configured for the source.
+    """
+    valid_departments = research_config.get_faculty_urls() if source == "research" else courses_config.get_base_urls()
+    if department not in valid_departments:
+        raise HTTPException(status_code=400, detail=f"{department} is not a valid department at WWU.")
+
+
+@app.get("/extract/research/{department_code}/stream")
+async def stream_research_endpoint(department_code: str, stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format")):
+    """
+    Streams faculty research information for a department, one professor at a time.
+
+    - **department_code**: The code for the department (e.g., 'CSCI').
+    - **format**: 'ndjson' (default) or 'sse' (Server-Sent Events).
+    """
+    logger.info(f"Received request to stream research for department: {department_code}")
+    _validate_department("research", department_code)
+    return _stream_extraction("research", department_code,
+                              # Written to the same CSV as /extract/research, published only if the stream completes
+                              tee_to_csv(stream_research_by_department(department_code), f"research_{department_code}.csv"),
+                              stream_format)
+
+
+@app.get("/extract/courses/{department_code}/stream")
+async def stream_courses_endpoint(department_code: str, stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format")):
+    """
+    Streams course information for a department, one course at a time.
+
+    - **department_code**: The code for the department (e.g., 'CSCI').
+    - **format**: 'ndjson' (default) or 'sse' (Server-Sent Events).
+    """
+    logger.info(f"Received request to stream courses for department: {department_code}")
+    _validate_department("courses", department_code)
+    return _stream_extraction("courses", department_code,
+                              # Written to the same CSV as /extract/courses, published only if the stream completes
+                              tee_to_csv(stream_courses(department_code), f"{department_code}_courses.csv"),
+                              stream_format)
+
+
+@app.get("/extract/events/stream")
+async def stream_events_endpoint(stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format")):
+    """
+    Streams events one at a time as they are extracted.
+
+    - **format**: 'ndjson' (default) or 'sse' (Server-Sent Events).
+    """
+    logger.info("Received request to stream events")
+    return _stream_extraction("events", None,
+                              tee_to_csv(stream_events(events_config.get_base_url()), "events.csv"), stream_format)
+
+
+@app.delete("/cache")
+async def invalidate_cache(source: Optional[Literal["research", "courses", "events"]] = None, department: Optional[str] = None):
+    """
+    Drops cached extraction responses.
+
+    - **source**: Only drop entries for this source. Drops everything when omitted.
+    - **department**: Only drop this department's entry for the source.
+    """
+    removed = await app.state.response_cache.invalidate(source, department)
+    logger.info(f"Invalidated {removed} cached responses (source={source}, department={department})")
+    return {"status": "invalidated", "removed": removed}
+
+
+EXTRACTION_SOURCES = ("research", "events", "courses")
+
+# Departments covered by /extract/all
+RESEARCH_DEPARTMENTS = ["CSCI", "MATH"]
+COURSE_DEPARTMENTS = ["CSCI", "MATH"]
+
+
+# Extractions currently running in this worker, shared by every caller asking for the same source/department
+_extraction_flights = SingleFlight()
+
+
+async def _extract_source(source: str, department: Optional[str] = None) -> List[Dict]:
+    """
+    Runs the extractor for a single source.
+
+    Concurrent calls for the same source and department (endpoint requests, cache refreshes,
+    jobs, /extract/all) share one underlying extraction and its result or error.
+
+    Args:
+        source: Source name ("research", "events" or "courses").
+        department: Department code for research and courses.
+
+    Returns:
+        List of extracted records.
+    """
+    return await _extraction_flights.do(f"{source}:{department or ''}", lambda: _run_extractor(source, department))
+
+
+async def _run_extractor(source: str, department: Optional[str]) -> List[Dict]:
+    if source == "research":
+        return await extract_research_by_department(department, debug_mode=False, write_to_csv=True)
+    if source == "courses":
+        return await extract_course(department, debug_mode=False)
+    if source == "events":
+        return await extract_events(events_config.get_base_url(), debug_mode=False)
+    raise ValueError(f"Unknown extraction source: {source}")
 
-    This endpoint will:
-    1. Extract research data for all departments (CSCI, BIO, MATH)
-    2. Extract all events
-    3. Extract course data for all departments (CSCI, MATH, PSYCH, BUS)
 
-    Returns a summary of what was extracted.
+async def _extract_and_cache(source: str, department: Optional[str] = None) -> List[Dict]:
     """
-    logger.info("Received request to extract all data")
+    Runs a fresh extraction and stores the result in the response cache.
+    """
+    data = await _extract_source(source, department)
+    if data:
+        await app.state.response_cache.put(source, department, data)
+    return data
+
+
+async def _run_extraction(source: str, key: str, extractor: Callable[[], Awaitable[Any]],
+                          source_limit: asyncio.Semaphore, global_limit: asyncio.Semaphore) -> Dict[str, Any]:
+    """
+    Runs a single source extraction under its per-source and global concurrency limits.
+
+    Args:
+        source: Source name ("research", "events" or "courses").
+        key: Department code, or the source name for sources without departments.
+        extractor: Zero-argument callable returning the extraction coroutine.
+        source_limit: Semaphore shared by all extractions of this source.
+        global_limit: Semaphore shared by every extraction in the fan-out.
+
+    Returns:
+        Result entry with status, record count and duration in seconds.
+    """
+    # Acquire the per-source slot first so queued work doesn't hold a global slot
+    async with source_limit, global_limit:
+        logger.info(f"Starting {source} extraction for {key}")
+        start = time.perf_counter()
+        try:
+            data = await extractor()
+            duration = round(time.perf_counter() - start, 2)
+            logger.info(f"Successfully extracted {source} for {key}: {len(data) if data else 0} records in {duration}s")
+            return {
+                "status": "success",
+                "count": len(data) if data else 0,
+                "duration_seconds": duration
+            }
+        except Exception as e:
+            duration = round(time.perf_counter() - start, 2)
+            logger.error(f"{source.capitalize()} extraction failed for {key}: {e}")
+            return {
+                "status": "failed",
+                "error": str(e),
+                "count": 0,
+                "duration_seconds": duration
+            }
+
 
+async def _extract_all(concurrent: bool = True,
+                       on_progress: Optional[Callable[[str, str, Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
+    """
+    Runs every source extraction and builds the /extract/all summary.
+
+    Args:
+        concurrent: Run sources concurrently under the configured limits, or one at a time.
+        on_progress: Optional coroutine function awaited with (source, key, result entry) as each source finishes.
+
+    Returns:
+        Summary of what was extracted, including how long each source took.
+    """
     results = {
         "research": {},
         "events": {"status": "pending", "count": 0},
@@ -162,90 +452,178 @@ async def extract_all():
         }
     }
 
-    # Define departments for research and courses
-    research_departments = ["CSCI", "MATH"]
-    course_departments = ["CSCI", "MATH"]
+    limits = shared_config.get_extraction_limits()
+    if not concurrent:
+        limits = {source: 1 for source in limits}
+    global_limit = asyncio.Semaphore(limits["global"])
+    source_limits = {source: asyncio.Semaphore(limits[source]) for source in EXTRACTION_SOURCES}
 
-    try:
-        # Extract research data for all departments
-        logger.info("Starting research data extraction...")
-        for dept in research_departments:
-            try:
-                research_data = await extract_research_by_department(dept, debug_mode=False, write_to_csv=True)
-                results["research"][dept] = {
-                    "status": "success",
-                    "count": len(research_data) if research_data else 0
-                }
-                results["summary"]["successful"] += 1
-                logger.info(f"Successfully extracted research for {dept}: {len(research_data) if research_data else 0} records")
-            except Exception as e:
-                results["research"][dept] = {
-                    "status": "failed",
-                    "error": str(e),
-                    "count": 0
-                }
-                results["summary"]["failed"] += 1
-                results["summary"]["errors"].append(f"Research extraction failed for {dept}: {str(e)}")
-                logger.error(f"Research extraction failed for {dept}: {e}")
-
-        # Extract events
-        logger.info("Starting events extraction...")
-        try:
-            from events_extractor.config import get_base_url
-            events = await extract_events(get_base_url(), debug_mode=False)
-            results["events"] = {
-                "status": "success",
-                "count": len(events) if events else 0
-            }
+    # (source, key) for every extraction in the fan-out
+    jobs = [("research", dept) for dept in RESEARCH_DEPARTMENTS]
+    jobs.append(("events", "events"))
+    jobs.extend(("courses", dept) for dept in COURSE_DEPARTMENTS)
+
+    async def run(source: str, key: str) -> Dict[str, Any]:
+        department = None if source == "events" else key
+        outcome = await _run_extraction(source, key, lambda: _extract_and_cache(source, department),
+                                        source_limits[source], global_limit)
+        if on_progress:
+            await on_progress(source, key, outcome)
+        return outcome
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*[run(source, key) for source, key in jobs])
+
+    for (source, key), outcome in zip(jobs, outcomes):
+        if source == "events":
+            results["events"] = outcome
+        else:
+            results[source][key] = outcome
+
+        if outcome["status"] == "success":
             results["summary"]["successful"] += 1
-            logger.info(f"Successfully extracted events: {len(events) if events else 0} records")
-        except Exception as e:
-            results["events"] = {
-                "status": "failed",
-                "error": str(e),
-                "count": 0
-            }
-            results["summary"]["failed"] += 1
-            results["summary"]["errors"].append(f"Events extraction failed: {str(e)}")
-            logger.error(f"Events extraction failed: {e}")
-
-        # Extract course data for all departments
-        logger.info("Starting course data extraction...")
-        for dept in course_departments:
-            try:
-                courses = await extract_course(dept, debug_mode=False)
-                results["courses"][dept] = {
-                    "status": "success",
-                    "count": len(courses) if courses else 0
-                }
-                results["summary"]["successful"] += 1
-                logger.info(f"Successfully extracted courses for {dept}: {len(courses) if courses else 0} records")
-            except Exception as e:
-                results["courses"][dept] = {
-                    "status": "failed",
-                    "error": str(e),
-                    "count": 0
-                }
-                results["summary"]["failed"] += 1
-                results["summary"]["errors"].append(f"Course extraction failed for {dept}: {str(e)}")
-                logger.error(f"Course extraction failed for {dept}: {e}")
-
-        # Calculate total extractions attempted
-        results["summary"]["total_extractions"] = len(research_departments) + len(events) + len(course_departments)
-
-        # Determine overall status
-        if results["summary"]["failed"] == 0:
-            results["summary"]["overall_status"] = "success"
-        elif results["summary"]["successful"] > 0:
-            results["summary"]["overall_status"] = "partial_success"
         else:
-            results["summary"]["overall_status"] = "failed"
+            results["summary"]["failed"] += 1
+            label = f"{source.capitalize()} extraction failed" + (f" for {key}" if source != "events" else "")
+            results["summary"]["errors"].append(f"{label}: {outcome['error']}")
+
+    results["summary"]["total_extractions"] = len(jobs)
+    results["summary"]["duration_seconds"] = round(time.perf_counter() - start, 2)
+
+    # Determine overall status
+    if results["summary"]["failed"] == 0:
+        results["summary"]["overall_status"] = "success"
+    elif results["summary"]["successful"] > 0:
+        results["summary"]["overall_status"] = "partial_success"
+    else:
+        results["summary"]["overall_status"] = "failed"
+
+    logger.info(f"Extraction complete in {results['summary']['duration_seconds']}s. Success: {results['summary']['successful']}, Failed: {results['summary']['failed']}")
+    return results
+
+
+@app.get("/extract/all")
+async def extract_all(concurrent: bool = True):
+    """
+    Extracts all data from all sources. This is the main endpoint for scheduled crawlers.
+
+    This endpoint will:
+    1. Extract research data for all departments (CSCI, MATH)
+    2. Extract all events
+    3. Extract course data for all departments (CSCI, MATH)
 
-        logger.info(f"Extraction complete. Success: {results['summary']['successful']}, Failed: {results['summary']['failed']}")
-        return results
+    Sources run concurrently, bounded by the per-source and global limits from
+    shared_utils.config.get_extraction_limits(). Pass concurrent=false to run them one at a time.
 
+    Returns a summary of what was extracted, including how long each source took.
+    """
+    logger.info(f"Received request to extract all data (concurrent={concurrent})")
+    try:
+        return await _extract_all(concurrent)
     except Exception as e:
         logger.error(f"Critical error during extract_all: {e}", exc_info=True)
-        results["summary"]["overall_status"] = "critical_failure"
-        results["summary"]["errors"].append(f"Critical error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Critical error during extraction: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Critical error during extraction: {str(e)}")
+
+
+class JobRequest(BaseModel):
+    source: Literal["research", "courses", "events", "all"] = Field(..., description="Source to extract")
+    department: Optional[str] = Field(None, description="Department code, required for research and courses")
+
+
+async def _heartbeat_jobs(store: JobStore, interval: float):
+    """
+    Keeps this worker's active jobs from being treated as interrupted.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(store.heartbeat)
+        except Exception as e:
+            logger.error(f"Job heartbeat failed: {e}")
+
+
+async def _run_job(store: JobStore, job_id: str, source: str, department: Optional[str]):
+    """
+    Runs an extraction job in the background and records its progress and result.
+
+    The job store is SQLite, so every call to it runs in a worker thread rather than on the event loop.
+    """
+    await asyncio.to_thread(store.start, job_id)
+    try:
+        if source == "all":
+            total = len(RESEARCH_DEPARTMENTS) + 1 + len(COURSE_DEPARTMENTS)
+            progress = {"completed": 0, "total": total, "failed": 0, "counts": {}}
+            await asyncio.to_thread(store.update_progress, job_id, progress)
+
+            # Sources finish concurrently; updates are written one at a time so they land in order
+            progress_lock = asyncio.Lock()
+
+            async def on_progress(src: str, key: str, outcome: Dict[str, Any]):
+                async with progress_lock:
+                    progress["completed"] += 1
+                    if outcome["status"] != "success":
+                        progress["failed"] += 1
+                    progress["counts"].setdefault(src, {})[key] = outcome["count"]
+                    await asyncio.to_thread(store.update_progress, job_id, progress)
+
+            result = await _extract_all(concurrent=True, on_progress=on_progress)
+        else:
+            await asyncio.to_thread(store.update_progress, job_id, {"completed": 0, "total": 1, "count": 0})
+            result = await _extract_and_cache(source, department)
+            await asyncio.to_thread(store.update_progress, job_id,
+                                    {"completed": 1, "total": 1, "count": len(result) if result else 0})
+        await asyncio.to_thread(store.succeed, job_id, result)
+        logger.info(f"Job {job_id} ({source} {department or ''}) finished")
+    except asyncio.CancelledError:
+        await asyncio.to_thread(store.fail, job_id, "Worker shut down before the job finished")
+        raise
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+        await asyncio.to_thread(store.fail, job_id, str(e))
+    finally:
+        _job_tasks.pop(job_id, None)
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(job_request: JobRequest):
+    """
+    Starts an extraction in the background and returns its job id immediately.
+
+    - **source**: 'research', 'courses', 'events' or 'all'.
+    - **department**: The department code (e.g., 'CSCI'), required for research and courses.
+    """
+    source = job_request.source
+    department = job_request.department
+    if source in ("research", "courses"):
+        _validate_department(source, department)
+    else:
+        department = None
+
+    store = app.state.job_store
+    job_id = await asyncio.to_thread(store.create, source, department)
+    _job_tasks[job_id] = asyncio.create_task(_run_job(store, job_id, source, department))
+    logger.info(f"Started job {job_id} for {source} {department or ''}")
+    return {"job_id": job_id, "status": "pending", "status_url": f"/jobs/{job_id}"}
+
+
+@app.get("/jobs")
+async def list_jobs(limit: int = 50):
+    """
+    Lists the most recent jobs and their progress.
+    """
+    store = app.state.job_store
+    await asyncio.to_thread(store.fail_stale)
+    return await asyncio.to_thread(store.recent, limit)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Reports a job's status and progress. Includes the result once the job has succeeded.
+    """
+    store = app.state.job_store
+    await asyncio.to_thread(store.fail_stale)
+    job = await asyncio.to_thread(store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
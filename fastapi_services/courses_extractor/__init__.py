@@ -1,3 +1,3 @@
-from .course_crawler import extract_course
+from .course_crawler import extract_course, stream_courses
 
-__all__ = ['extract_course']
\ No newline at end of file
+__all__ = ['extract_course', 'stream_courses']
\ No newline at end of file
@@ -21,10 +21,11 @@ def get_llm_prompt() -> List[Dict[str, str]]:
             "content": """Your role is to extract information from a markdown file.
                     Given a markdown file, extract and return a list of courses. Each course should have the following fields:
 
+                        course_code: str
                         course_name: str
                         course_description: str
-                        course_prereqs: str
-                        course_credits: int
+                        prereqs: str
+                        credits: int
             """
         },
         {
@@ -3,11 +3,11 @@ import os
 import logging
 import re
 
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig
+from crawl4ai import CrawlerRunConfig, BrowserConfig
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Optional
 
 import sys
 import os
@@ -19,6 +19,10 @@ from shared_utils import csv_writer
 from shared_utils import llm_init
 from shared_utils import write_to_db
 from shared_utils import llm_ainvoke_batch
+from shared_utils import PackedExtractor
+from shared_utils import llm_astream_batch
+from shared_utils import get_crawler
+from shared_utils import get_page_state_store, content_hash, record_run_stats
 from courses_extractor import config
 
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +31,7 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 class courseInfo(BaseModel):
+    course_code: str = Field("", description="Catalog code of the course, e.g. CSCI 141")
     course_name:str = Field(..., description="Name of the course")
     course_description: str = Field(..., description="Description of the course")
     prereqs: str = Field("", description="Prerequisites of the course")
@@ -65,51 +70,209 @@ async def prefilter_markdown(markdown: str) -> list[str]:
         return [markdown]
 
 
-async def crawl_courses(department_code: str, debug_mode: bool) -> List:
+# Heading of a catalog block, e.g. "### CSCI 141 - Computer Programming I"
+COURSE_HEADING = re.compile(r"^#+\s*(?P<code>[A-Z]{2,5}\s?\d{3}[A-Z]?)\s*[-\u2013\u2014]\s*(?P<title>.+?)\s*$")
+# A single number only: variable credits ("Credits: 2-4") don't fit courseInfo.credits and go to the LLM
+CREDITS = re.compile(r"^Credits?\s*:?\s*(?P<credits>\d+)\s*$", re.IGNORECASE)
+PREREQS = re.compile(r"^Prerequisites?(?:\s*(?:&|and)\s*Notes)?\s*:?\s*(?P<prereqs>.*)$", re.IGNORECASE)
+# Lines that end the description or prerequisite text
+SECTION_LABEL = re.compile(
+    r"^(?:Credits?|Prerequisites?|Grade Mode|Grading|General University Requirements?|GUR|"
+    r"Equivalent|Course Attributes?|Repeatable|Notes?)\b",
+    re.IGNORECASE,
+)
+MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+MIN_DESCRIPTION_LENGTH = 20
+
+
+def _clean_markdown_line(line: str) -> str:
+    line = MARKDOWN_LINK.sub(r"\1", line)
+    line = line.replace("**", "").replace("__", "")
+    return re.sub(r"\s+", " ", line).strip()
+
+
+def parse_course_block(block: str) -> Optional[Dict]:
+    """
+    Reads a course straight from an acalog `###...---` block.
+
+    Expects the catalog layout: a "CODE NUM - Title" heading, the description, then labelled
+    lines such as "Prerequisites & Notes" and "Credits: 4".
+
+    Returns:
+        courseInfo dictionary, or None when the block does not parse confidently (a code, a title,
+        a description and credits are all required); such blocks go to the LLM.
+    """
+    lines = [_clean_markdown_line(line) for line in block.splitlines()]
+    lines = [line for line in lines if line and line != "---"]
+    if not lines:
+        return None
+
+    heading = COURSE_HEADING.match(lines[0])
+    if not heading:
+        return None
+
+    description, prereqs, credits = [], [], None
+    section = "description"
+    for line in lines[1:]:
+        credits_match = CREDITS.match(line)
+        prereqs_match = PREREQS.match(line)
+        if credits_match:
+            if credits is None:
+                credits = int(credits_match.group("credits"))
+            section = None
+        elif prereqs_match:
+            section = "prereqs"
+            if prereqs_match.group("prereqs"):
+                prereqs.append(prereqs_match.group("prereqs"))
+        elif SECTION_LABEL.match(line):
+            section = None
+        elif section == "description":
+            description.append(line)
+        elif section == "prereqs":
+            prereqs.append(line)
+
+    course = courseInfo(
+        course_code=re.sub(r"\s+", " ", heading.group("code")),
+        course_name=heading.group("title"),
+        course_description=" ".join(description),
+        prereqs=" ".join(prereqs),
+        credits=credits if credits is not None else -1,
+    )
+    if credits is None or len(course.course_description) < MIN_DESCRIPTION_LENGTH:
+        return None
+    return course.model_dump()
+
+
+async def crawl_course_blocks(department_code: str, debug_mode: bool) -> List[str]:
+    """
+    Crawls a department's catalog page and splits it into one markdown block per course.
+    """
     # Retrieve url to scrape
     base_urls = config.get_base_urls()
     if department_code not in base_urls:
         raise ValueError(f"{department_code} is not a valid department at WWU.")
     base_url = base_urls[department_code]
 
-    # Configs
-    prompt_template = ChatPromptTemplate.from_messages(config.get_llm_prompt())
     crawler_config_dict = config.get_crawler_config()
     crawler_config = CrawlerRunConfig(**crawler_config_dict)
     browser_config_dict = config.get_browser_config(debug_mode)
     b_config = BrowserConfig(**browser_config_dict)
 
-    # List of courses to return
-    course_list = []
-
     # Start crawl
-    async with AsyncWebCrawler(config=b_config) as crawler:
+    async with get_crawler(b_config) as crawler:
         results = await crawler.arun(url=base_url, config=crawler_config)
-        markdown_list = await prefilter_markdown(results.markdown)
-        if not markdown_list:
-            return []
-        try:
-            llm = llm_init(prompt_template, courseInfo, "gemini-2.5-flash-lite", "google-genai")
-            for i, entry in enumerate(markdown_list):
-                logger.info(f"invoking markdown extraction {i}")
-                course = llm.invoke({"markdown": entry})
-                course_list.append(course.model_dump())
 
+    return await prefilter_markdown(results.markdown)
+
+
+async def crawl_courses(department_code: str, debug_mode: bool, incremental: bool = True) -> List:
+    """
+    Crawls and extracts a department's courses.
+
+    The catalog page is always re-rendered, since course descriptions are expanded by JS and a
+    conditional request on the page URL cannot see them change. Instead each course block is
+    keyed by its normalized content hash; with incremental=True, blocks seen before reuse their
+    previous extraction and only new or edited blocks go to the LLM.
+    """
+    markdown_list = await crawl_course_blocks(department_code, debug_mode)
+    if not markdown_list:
+        return []
+
+    # The store is SQLite: opening it, lookups and writes run in a worker thread, batched per step
+    store = await asyncio.to_thread(get_page_state_store)
+    block_prefix = f"{config.get_base_urls()[department_code]}#"
+    block_hashes = await asyncio.to_thread(lambda: [content_hash(entry, is_html=False) for entry in markdown_list])
+    block_keys = [block_prefix + block_hash for block_hash in block_hashes]
+    stats = {"pages": 1, "refetched": 1, "blocks": len(markdown_list), "unchanged": 0, "re_extracted": 0,
+             "fast_path": 0, "failed": 0}
+
+    # Courses in catalog order. None marks blocks that still need the LLM.
+    course_list = [None] * len(markdown_list)
+    if incremental:
+        states = await asyncio.to_thread(store.get_many, block_keys)
+        for i, key in enumerate(block_keys):
+            state = states.get(key)
+            if state and state["extraction"] is not None:
+                course_list[i] = state["extraction"]
+                stats["unchanged"] += 1
+    logger.info(f"{stats['unchanged']} of {len(markdown_list)} course blocks unchanged for {department_code}")
+
+    # Fast path: blocks in the regular catalog layout are parsed without the LLM
+    parsed = []
+    for i, course in enumerate(course_list):
+        if course is not None:
+            continue
+        course = parse_course_block(markdown_list[i])
+        if course is not None:
+            course_list[i] = course
+            parsed.append((block_keys[i], block_hashes[i], course, None, None))
+            stats["fast_path"] += 1
+    await asyncio.to_thread(store.record_extractions, parsed)
+    logger.info(f"Parsed {stats['fast_path']} course blocks for {department_code} without the LLM")
+
+    pending = [i for i, course in enumerate(course_list) if course is None]
+    if pending:
+        try:
+            extractor = PackedExtractor(config.get_llm_prompt(), courseInfo, "gemini-2.5-flash-lite", "google-genai")
         except Exception as e:
             logger.error(f"LLM error extracting courses: {e}")
             return []
-    
-    return course_list
+        # Many blocks share one request instead of repeating the system prompt per block
+        extracted = await extractor.ainvoke([markdown_list[i] for i in pending])
+        llm_parsed = []
+        for i, course in zip(pending, extracted):
+            if course is None:
+                stats["failed"] += 1
+                continue
+            course_list[i] = course
+            llm_parsed.append((block_keys[i], block_hashes[i], course, None, None))
+            stats["re_extracted"] += 1
+        await asyncio.to_thread(store.record_extractions, llm_parsed)
+
+    # Forget blocks that are no longer in the catalog
+    await asyncio.to_thread(store.prune, block_prefix, block_keys)
+    stats["skipped"] = stats["unchanged"]
+    record_run_stats(f"courses:{department_code}", stats)
+    logger.info(f"Incremental crawl stats for courses:{department_code}: {stats}")
+
+    # Failed blocks are left out rather than failing the whole catalog
+    return [course for course in course_list if course is not None]
 
 async def extract_course(department_code: str, debug_mode: bool=False):
     course_info = await crawl_courses(department_code, debug_mode)
     if course_info:
         csv_writer(course_info, f"{department_code}_courses.csv")
-    print(type(course_info[0]))
 
     return course_info
 
 
+async def stream_courses(department_code: str, debug_mode: bool=False) -> AsyncIterator[dict]:
+    """
+    Streams a department's courses, yielding parsed blocks at once and the rest as soon as the LLM extracts them.
+
+    Yields:
+        Course dictionaries, in completion order
+    """
+    markdown_list = await crawl_course_blocks(department_code, debug_mode)
+    if not markdown_list:
+        return
+
+    unparsed = []
+    for entry in markdown_list:
+        course = parse_course_block(entry)
+        if course is not None:
+            yield course
+        else:
+            unparsed.append(entry)
+    if not unparsed:
+        return
+
+    extractor = PackedExtractor(config.get_llm_prompt(), courseInfo, "gemini-2.5-flash-lite", "google-genai")
+    async for _, course in extractor.astream(unparsed):
+        if course:
+            yield course
+
+
 if __name__ == "__main__":
     res = asyncio.run(extract_course("CSCI", debug_mode=True))
     print(res)
\ No newline at end of file
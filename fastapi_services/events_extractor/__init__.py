@@ -1,3 +1,3 @@
-from .events_crawler import extract_events
+from .events_crawler import extract_events, stream_events
 
-__all__ = ['extract_events']
\ No newline at end of file
+__all__ = ['extract_events', 'stream_events']
\ No newline at end of file
@@ -1,3 +1,4 @@
+import os
 from typing import List, Dict
 
 
@@ -7,6 +8,22 @@ def get_base_url() -> str:
     """
     return "https://win.wwu.edu/events/?categories=9821&categories=17934&categories=21914&categories=9822&categories=11780&categories=23412&categories=9830"
 
+def get_feed_settings() -> Dict:
+    """
+    Get settings for reading events from the Engage JSON feed that backs the events page.
+    The browser crawl is only used when the feed is disabled or fails.
+    """
+    return {
+        # "feed" pages through the JSON API; "browser" always renders the events page
+        "mode": os.getenv("EVENTS_SOURCE_MODE", "feed"),
+        "url": os.getenv("EVENTS_FEED_URL", "https://win.wwu.edu/api/discovery/event/search"),
+        "page_size": int(os.getenv("EVENTS_FEED_PAGE_SIZE", "50")),
+        # Feed pages fetched at once after the first page reports the total count
+        "max_concurrent_pages": int(os.getenv("EVENTS_FEED_MAX_CONCURRENT_PAGES", "4")),
+        # Event times are reported in UTC and shown in campus time
+        "timezone": "America/Los_Angeles",
+    }
+
 def get_llm_prompt() -> List[Dict[str, str]]:
     """
     Get the LLM prompt template for extracting event information from HTML.
@@ -28,6 +45,22 @@ def get_llm_prompt() -> List[Dict[str, str]]:
         }
     ]
 
+def get_card_schema() -> Dict[str, str]:
+    """
+    Get the selectors used to read event cards without the LLM.
+
+    Cards are Campus Labs Engage links, e.g.
+    <a href="/event/123"><div class="MuiCard-root">...<h3>Name</h3>...<svg><title>Date</title></svg>Friday, October 18 at 7:00PM PDT</div>...</a>
+    """
+    return {
+        # Title of the card
+        "event_name": "h3",
+        # The date line is marked by an icon whose <title> is "Date"
+        "date_icon_title": "Date",
+        # Event links look like /event/123
+        "page_url_pattern": r"/event/\d+",
+    }
+
 def get_js_commands() -> List[str]:
     """
     Get JavaScript commands for scrolling and loading more events.
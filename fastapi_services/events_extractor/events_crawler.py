@@ -3,14 +3,17 @@ import os
 import logging
 import csv
 import re
-from bs4 import BeautifulSoup
+import uuid
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from bs4 import BeautifulSoup, Tag
 
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, BrowserConfig
+from crawl4ai import CrawlerRunConfig, BrowserConfig
 from dotenv import load_dotenv
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
-from typing import List, Dict
-from urllib.parse import urljoin, urlparse
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urljoin, urlparse
 
 import sys
 import os
@@ -19,6 +22,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from shared_utils import csv_writer
 from shared_utils import llm_init
+from shared_utils import get_crawler
+from shared_utils import llm_astream_batch
+from shared_utils import PackedExtractor
+from shared_utils import record_run_stats
+from shared_utils import get_http_client
 from events_extractor import config
 
 
@@ -54,62 +62,268 @@ def prefilter_html(html: str) -> list[str]:
         logger.error(f"Error pre-filtering HTML: {e}")
         return [html]
 
+# Fallback for cards without a date icon, e.g. "Friday, October 18 at 7:00PM PDT"
+DATE_PATTERN = re.compile(
+    r"\b(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)[a-z]*,\s+"
+    r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2}"
+    # Card text is flattened, so stop after the time and zone rather than run into the location
+    r"(?:\s+at\s+\d{1,2}:\d{2}\s*[AP]M(?:\s+[A-Z]{2,5}\b)?)?"
+)
+
+def parse_event_card(card) -> Optional[Dict]:
+    """
+    Reads an event straight from its card markup using the selectors in config.get_card_schema().
+
+    Returns:
+        Event dictionary, or None if any field could not be found (the card then goes to the LLM).
+    """
+    if not isinstance(card, Tag):
+        return None
+    schema = config.get_card_schema()
+
+    href = card.get("href") or ""
+    if not re.search(schema["page_url_pattern"], href):
+        return None
+
+    name_tag = card.select_one(schema["event_name"])
+    event_name = name_tag.get_text(" ", strip=True) if name_tag else ""
+
+    date = ""
+    icon_title = card.find("title", string=lambda text: text and text.strip() == schema["date_icon_title"])
+    if icon_title and icon_title.find_parent("svg") and icon_title.find_parent("svg").parent:
+        date = icon_title.find_parent("svg").parent.get_text(" ", strip=True)
+        date = date.replace(schema["date_icon_title"], "", 1).strip()
+    if not date:
+        match = DATE_PATTERN.search(card.get_text(" ", strip=True))
+        date = match.group(0).strip() if match else ""
+
+    if not event_name or not date:
+        return None
+    return {
+        "event_name": event_name,
+        "date": date,
+        "page_url": urljoin(config.get_base_url(), href),
+    }
+
+def parse_event_cards(cards: list) -> Tuple[List[Dict], list]:
+    """
+    Splits cards into events read by the parser and cards that need the LLM.
+
+    Returns:
+        (parsed events, unparsed cards)
+    """
+    events, unparsed = [], []
+    for card in cards:
+        event = parse_event_card(card)
+        if event:
+            events.append(event)
+        else:
+            unparsed.append(card)
+    logger.info(f"Parsed {len(events)} of {len(cards)} event cards without the LLM")
+    return events, unparsed
+
 async def save_html(html: str, filename: str):
     with open(filename, "w") as f:
         f.write(html)
 
-async def crawl_events(base_url: str, debug_mode: bool = False) -> List[EventEntry]:
+async def load_event_cards(base_url: str, debug_mode: bool = False) -> list:
+    """
+    Loads the full events page (scrolling and clicking "Load More" until it stops growing)
+    and returns the event card elements.
+    """
     prev_page_len = 0
     cur_page_len = 0
 
     browser_config_dict = config.get_browser_config(debug_mode)
     b_config = BrowserConfig(**browser_config_dict)
 
-    async with AsyncWebCrawler(config=b_config) as crawler:
-        # create a persistent session
-        crawler_config_dict = config.get_crawler_config()
-        crawler_config = CrawlerRunConfig(**crawler_config_dict)
+    # create a persistent session. The id is unique per call because pooled browsers are shared.
+    crawler_config_dict = config.get_crawler_config()
+    crawler_config_dict["session_id"] = f"{crawler_config_dict['session_id']}_{uuid.uuid4().hex}"
+    crawler_config = CrawlerRunConfig(**crawler_config_dict)
 
-        # navigate once to the base URL
-        await crawler.arun(url=base_url, config=CrawlerRunConfig(session_id=crawler_config_dict["session_id"]))
+    async with get_crawler(b_config) as crawler:
+        try:
+            # navigate once to the base URL
+            await crawler.arun(url=base_url, config=CrawlerRunConfig(session_id=crawler_config_dict["session_id"]))
+
+            while True:
+                # execute JS without reloading the page
+                results = await crawler.arun(url=base_url, config=crawler_config)
+                await asyncio.sleep(5)
+                cur_page_len = len(results.html)
+                # debugging check
+                print("Page length:", cur_page_len)
+
+                if cur_page_len == prev_page_len:
+                    break
+                else:
+                    prev_page_len = cur_page_len
 
-        while True:
-            # execute JS without reloading the page
             results = await crawler.arun(url=base_url, config=crawler_config)
-            await asyncio.sleep(5)
-            cur_page_len = len(results.html)
-            # debugging check
-            print("Page length:", cur_page_len)
-
-            if cur_page_len == prev_page_len:
-                break
-            else:
-                prev_page_len = cur_page_len
-
-        results = await crawler.arun(url=base_url, config=crawler_config)
-        filtered_html_list = prefilter_html(results.html)
-        
-        events_list = []
+        finally:
+            await crawler.crawler_strategy.kill_session(crawler_config_dict["session_id"])
+
+    return prefilter_html(results.html)
+
+def _format_feed_date(starts_on: str, tz: str) -> str:
+    """
+    Formats a feed timestamp like the event cards do, e.g. "Friday, October 18 at 7:00PM PDT".
+    """
+    start = datetime.fromisoformat(starts_on.replace("Z", "+00:00"))
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    try:
+        start = start.astimezone(ZoneInfo(tz))
+    except ZoneInfoNotFoundError:
+        # Images without tzdata keep UTC
+        pass
+    return f"{start:%A, %B} {start.day} at {start.hour % 12 or 12}:{start:%M%p %Z}"
+
+def _feed_item_to_event(item: Dict, tz: str) -> Optional[Dict]:
+    if not item.get("id") or not item.get("name") or not item.get("startsOn"):
+        return None
+    return {
+        "event_name": item["name"].strip(),
+        "date": _format_feed_date(item["startsOn"], tz),
+        "page_url": urljoin(config.get_base_url(), f"/event/{item['id']}"),
+    }
+
+async def fetch_event_feed(base_url: str) -> List[Dict]:
+    """
+    Reads events from the Engage JSON feed that backs the events page.
+
+    The first page reports the total (@odata.count); the remaining pages are then fetched in
+    parallel over the pooled HTTP client. Category filters are taken from base_url.
+
+    Returns:
+        Event dictionaries in feed order, de-duplicated by event id.
+    """
+    settings = config.get_feed_settings()
+    client = get_http_client()
+    params = {
+        "endsAfter": datetime.now(timezone.utc).isoformat(),
+        "orderByField": "endsOn",
+        "orderByDirection": "ascending",
+        "status": "Approved",
+        "categoryIds": parse_qs(urlparse(base_url).query).get("categories", []),
+        "take": settings["page_size"],
+    }
+
+    async def fetch_page(skip: int) -> Dict:
+        response = await client.get(settings["url"], params={**params, "skip": skip},
+                                    headers={"Accept": "application/json"})
+        response.raise_for_status()
+        return response.json()
+
+    first = await fetch_page(0)
+    total = int(first.get("@odata.count", len(first.get("value", []))))
+    semaphore = asyncio.Semaphore(settings["max_concurrent_pages"])
+
+    async def fetch_limited(skip: int) -> Dict:
+        async with semaphore:
+            return await fetch_page(skip)
+
+    skips = range(settings["page_size"], total, settings["page_size"])
+    pages = [first] + list(await asyncio.gather(*[fetch_limited(skip) for skip in skips]))
+    logger.info(f"Fetched {total} events from the feed in {len(pages)} pages")
+
+    events, seen = [], set()
+    for page in pages:
+        for item in page.get("value", []):
+            event = _feed_item_to_event(item, settings["timezone"])
+            if event and item["id"] not in seen:
+                seen.add(item["id"])
+                events.append(event)
+    return events
+
+async def _events_from_feed(base_url: str) -> Optional[List[Dict]]:
+    """
+    Returns feed events, or None when the feed is disabled, fails or is empty (use the browser instead).
+    """
+    if config.get_feed_settings()["mode"] != "feed":
+        return None
+    try:
+        events = await fetch_event_feed(base_url)
+    except Exception as e:
+        logger.warning(f"Events feed failed, falling back to the browser crawl: {e}")
+        return None
+    if not events:
+        logger.warning("Events feed returned no events, falling back to the browser crawl")
+        return None
+    record_run_stats("events", {"source": "feed", "events": len(events)})
+    return events
+
+async def crawl_events(base_url: str, debug_mode: bool = False) -> List[EventEntry]:
+    """
+    Extracts events from the JSON feed, falling back to rendering the events page.
+    """
+    events = await _events_from_feed(base_url)
+    if events is not None:
+        return events
+    return await crawl_events_from_browser(base_url, debug_mode)
+
+async def crawl_events_from_browser(base_url: str, debug_mode: bool = False) -> List[EventEntry]:
+    filtered_html_list = await load_event_cards(base_url, debug_mode)
+
+    # Fast path: most cards are read directly; only the rest go to the LLM
+    events_list, unparsed = parse_event_cards(filtered_html_list)
+    stats = {"source": "browser", "cards": len(filtered_html_list), "fast_path": len(events_list), "llm": len(unparsed), "failed": 0}
+
+    if unparsed:
         try:
-            prompt_template = ChatPromptTemplate.from_messages(config.get_llm_prompt())
-            extraction_chain = llm_init(prompt_template, EventEntry, "gemini-2.5-flash-lite", "google-genai")
-            for html in filtered_html_list:
-                # debugging check
-                logger.info("Extracting event information")
-                output = extraction_chain.invoke({"html": html})
-                event = output.model_dump()
+            extractor = PackedExtractor(config.get_llm_prompt(), EventEntry, "gemini-2.5-flash-lite", "google-genai",
+                                        variable="html")
+            async for _, event in extractor.astream([str(html) for html in unparsed]):
+                if not event:
+                    stats["failed"] += 1
+                    continue
                 event["page_url"] = urljoin(config.get_base_url(), event["page_url"])
                 events_list.append(event)
 
         except Exception as e:
             logger.error(f"Error extracting events: {e}")
-            return []
 
-        if not events_list:
-            logger.warning("Did not find any events")
-            return []
+    record_run_stats("events", stats)
+    logger.info(f"Event card stats: {stats}")
+
+    if not events_list:
+        logger.warning("Did not find any events")
+        return []
+
+    return events_list
+
+
+async def stream_events(base_url: str, debug_mode: bool = False) -> AsyncIterator[dict]:
+    """
+    Streams events. Feed events are yielded at once; on the browser fallback, parsed cards are
+    yielded at once and the rest as soon as the LLM extracts them.
+
+    Yields:
+        Event dictionaries, in completion order
+    """
+    events = await _events_from_feed(base_url)
+    if events is not None:
+        for event in events:
+            yield event
+        return
+
+    filtered_html_list = await load_event_cards(base_url, debug_mode)
+    if not filtered_html_list:
+        return
+
+    events, unparsed = parse_event_cards(filtered_html_list)
+    for event in events:
+        yield event
+    if not unparsed:
+        return
 
-        return events_list
+    extractor = PackedExtractor(config.get_llm_prompt(), EventEntry, "gemini-2.5-flash-lite", "google-genai",
+                                variable="html")
+    async for _, event in extractor.astream([str(html) for html in unparsed]):
+        if event:
+            event["page_url"] = urljoin(config.get_base_url(), event["page_url"])
+            yield event
 
 
 async def extract_events(base_url: str, debug_mode: bool = False):
@@ -1,3 +1,3 @@
-from .research_crawler import extract_research_by_department
+from .research_crawler import extract_research_by_department, stream_research_by_department
 
-__all__ = ['extract_research_by_department']
\ No newline at end of file
+__all__ = ['extract_research_by_department', 'stream_research_by_department']
\ No newline at end of file
@@ -1,3 +1,4 @@
+import os
 from typing import Dict, List
 
 def get_base_urls() -> Dict[str, str]:
@@ -90,4 +91,24 @@ def get_professor_profile_schema() -> Dict:
                 "default": "None"
             },
         ]
+    }
+
+def get_profile_crawler_config() -> Dict:
+    """
+    Crawler run configuration for professor profile pages.
+    Site chrome is dropped before the page is converted to markdown.
+    """
+    return {
+        "excluded_tags": ["nav", "footer", "aside", "script", "style", "noscript", "form"],
+    }
+
+def get_prefilter_settings() -> Dict:
+    """
+    Settings for trimming professor page markdown before it is sent to the LLM.
+    """
+    return {
+        # Sections kept besides the one under the page title (which holds the name and website)
+        "keep_sections": r"research|interest|expertise|areas? of|website|homepage|personal page",
+        # Per-page ceiling on estimated input tokens
+        "max_tokens": int(os.getenv("RESEARCH_MAX_PAGE_TOKENS", "2000")),
     }
\ No newline at end of file
@@ -2,10 +2,11 @@ import asyncio
 import json
 import os
 import logging
+import re
 
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, JsonCssExtractionStrategy, BrowserConfig
+from crawl4ai import CrawlerRunConfig, JsonCssExtractionStrategy, BrowserConfig
 from urllib.parse import urljoin, urlparse
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Tuple
 from pydantic import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate
 
@@ -17,9 +18,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from shared_utils import csv_writer
 from shared_utils import llm_init
-from shared_utils import llm_ainvoke_batch
+from shared_utils import llm_astream_batch
 from research_extractor import config
 from shared_utils import write_to_db
+from shared_utils import get_write_queue
+from shared_utils import get_crawler
+from shared_utils import get_page_state_store, conditional_fetch, record_run_stats
+from shared_utils import config as shared_config
+from shared_utils import estimate_tokens
 
 
 # Configure logging
@@ -33,6 +39,67 @@ class ProfessorPage(BaseModel):
     research_interest: List[str] = Field(default_factory=list, description="List of professor's research interests")
     src_url: str = Field(..., description="Source URL of the professor's page")
 
+MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+
+
+def _is_link_only(line: str) -> bool:
+    # Menus, breadcrumbs and social icons are lines of links with no text of their own
+    return bool(MARKDOWN_LINK.search(line)) and not re.search(r"\w", MARKDOWN_LINK.sub("", line))
+
+
+def prefilter_professor_markdown(markdown: str) -> str:
+    """
+    Trims a professor page to what the prompt needs: the section under the page title (name,
+    website) and sections about research interests or the professor's website. Link-only lines
+    outside those sections (menus, breadcrumbs) are dropped, and the result is cut to the
+    per-page token ceiling.
+
+    Falls back to the whole page minus link-only lines when no research or website section is found.
+    """
+    if not markdown:
+        return ""
+    settings = config.get_prefilter_settings()
+    keep_sections = re.compile(settings["keep_sections"], re.IGNORECASE)
+
+    # Split into (heading, lines) sections; lines before the first heading form a section without one
+    sections = [(None, [])]
+    for line in str(markdown).splitlines():
+        heading = HEADING.match(line.strip())
+        if heading:
+            sections.append((heading.group(2), [line]))
+        else:
+            sections[-1][1].append(line)
+
+    title_index = next((i for i, (heading, _) in enumerate(sections) if heading), None)
+    kept = []
+    matched = False
+    for i, (heading, lines) in enumerate(sections):
+        if heading and keep_sections.search(heading):
+            matched = True
+            kept.extend(lines)
+        elif i == title_index:
+            kept.extend(line for line in lines if not _is_link_only(line) or "http" in line)
+    if not matched:
+        kept = [line for _, lines in sections for line in lines if not _is_link_only(line)]
+
+    filtered = re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+    max_chars = settings["max_tokens"] * 4
+    if len(filtered) > max_chars:
+        filtered = filtered[:max_chars]
+    return filtered
+
+
+def llm_input_for_page(page) -> Dict[str, str]:
+    """
+    Builds the prompt variables for a crawled professor page, logging the tokens saved by the pre-filter.
+    """
+    markdown = prefilter_professor_markdown(page.markdown)
+    logger.info(f"Professor page {page.url}: ~{estimate_tokens(str(page.markdown))} tokens before pre-filter, "
+                f"~{estimate_tokens(markdown)} after")
+    return {"markdown": markdown, "src_url": page.url}
+
+
 async def extract_faculty_urls(department_code:str, debug_mode: bool=False) -> List[str]:
     """
     Extracts all professor profile URLS from a department's faculty page.
@@ -63,7 +130,7 @@ async def extract_faculty_urls(department_code:str, debug_mode: bool=False) -> L
     faculty_url = faculty_urls[department_code]
 
     # Run crawler
-    async with AsyncWebCrawler(config=browser_config) as crawler:
+    async with get_crawler(browser_config) as crawler:
         results = await crawler.arun(faculty_url, config=crawler_config)
         if not results.extracted_content:
             logger.warning(f"No content extracted from {faculty_url}.")
@@ -78,48 +145,142 @@ async def extract_faculty_urls(department_code:str, debug_mode: bool=False) -> L
         return list(all_pages)
 
 
-async def extract_professor_information(url_list: List, debug_mode: bool=False) -> List[dict]:
+async def check_professor_pages(url_list: List[str], stats: Dict) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    """
+    Checks which professor pages changed since their last extraction.
+
+    Each page is requested with its stored ETag / Last-Modified. A 304, or a 200 whose normalized
+    content hash matches the stored one, means the previous extraction can be reused. Otherwise the
+    downloaded HTML is kept so the page is not fetched a second time for extraction.
+
+    Args:
+        url_list: Professor page URLs
+        stats: Run stats to update (not_modified, refetched, unchanged)
+
+    Returns:
+        Tuple of (reused extractions by URL, fetch info by URL for pages that need re-extraction)
+    """
+    # The store is SQLite: opening it and every lookup or write run in a worker thread
+    store = await asyncio.to_thread(get_page_state_store)
+    semaphore = asyncio.Semaphore(shared_config.get_page_state_settings()["max_concurrent_checks"])
+    reused = {}
+    changed = {}
+
+    async def check(url):
+        state = await asyncio.to_thread(store.get, url)
+        async with semaphore:
+            try:
+                fetched = await conditional_fetch(url, state)
+            except Exception as e:
+                logger.warning(f"Conditional fetch failed for {url}, re-extracting: {e}")
+                changed[url] = {}
+                return
+        if fetched["status"] == "not_modified":
+            stats["not_modified"] += 1
+            reused[url] = state["extraction"]
+            return
+        stats["refetched"] += 1
+        if state and state["extraction"] is not None and state["content_hash"] == fetched["content_hash"]:
+            stats["unchanged"] += 1
+            await asyncio.to_thread(store.record_unchanged, url, fetched["etag"], fetched["last_modified"])
+            reused[url] = state["extraction"]
+        else:
+            changed[url] = fetched
+
+    await asyncio.gather(*[check(url) for url in url_list])
+    return reused, changed
+
+
+async def extract_professor_information(url_list: List, debug_mode: bool=False, incremental: bool=True,
+                                        stats_key: str="research") -> List[dict]:
     """
     Extract professor information from a list of URLs using async processing.
+
+    With incremental=True, pages that have not changed since the last run reuse their previous
+    extraction; only new or changed pages are crawled and sent to the LLM.
     
     Args:
         url_list: List of professor page URLs to process
         debug_mode: Whether to run in debug mode (non-headless browser)
+        incremental: Skip unchanged pages using the page state store
+        stats_key: Key the run stats are recorded under (e.g. 'research:CSCI')
         
     Returns:
         List of processed professor information dictionaries
     """
     logger.info(f"Starting extraction for {len(url_list)} professor URLs")
+    stats = {"pages": len(url_list), "not_modified": 0, "refetched": 0, "unchanged": 0, "re_extracted": 0, "failed": 0,
+             "tokens_before": 0, "tokens_after": 0}
     
     prompt_template = ChatPromptTemplate.from_messages(config.get_llm_prompt())
     llm_chain = llm_init(prompt_template, ProfessorPage, model="gemini-2.5-flash-lite", model_provider="google-genai")
     browser_config = BrowserConfig(headless= (not debug_mode))
+    store = await asyncio.to_thread(get_page_state_store)
+
+    if incremental:
+        professors, changed = await check_professor_pages(url_list, stats)
+    else:
+        professors, changed = {}, {url: {} for url in url_list}
+    urls_to_extract = [url for url in url_list if url in changed]
+    logger.info(f"{len(professors)} professor pages unchanged, extracting {len(urls_to_extract)}")
+
+    # Pages the change check already downloaded are converted from that HTML; only the rest are crawled
+    downloaded = [url for url in urls_to_extract if changed[url].get("html")]
+    urls_to_crawl = [url for url in urls_to_extract if not changed[url].get("html")]
 
     try:
-        async with AsyncWebCrawler(config=browser_config) as crawler:
-            # returns a list of crawlerrun objects
-            logger.info("Starting concurrent web crawling...")
-            professor_info_list = await crawler.arun_many(url_list)
-            logger.info(f"Completed crawling {len(professor_info_list)} pages")
-
-            
-            # Process all LLM calls concurrently
-            if professor_info_list:
-                research_info = await llm_ainvoke_batch(
-                    llm_chain, 
-                    professor_info_list, 
-                    max_concurrent=5 
-                )
-                logger.info(f"Successfully processed {len(research_info)} professor profiles")
-            else:
-                logger.warning("No markdown content found for LLM processing")
-                research_info = []
+        if urls_to_extract:
+            async with get_crawler(browser_config, pages=len(urls_to_crawl)) as crawler:
+                crawler_config = CrawlerRunConfig(**config.get_profile_crawler_config())
+                professor_info_list = []
+                if urls_to_crawl:
+                    # returns a list of crawlerrun objects
+                    logger.info("Starting concurrent web crawling...")
+                    professor_info_list += await crawler.arun_many(urls_to_crawl, config=crawler_config)
+
+                async def convert(url):
+                    # base_url resolves the page's relative links as if it had been crawled
+                    page = await crawler.arun(f"raw:{changed[url]['html']}", config=crawler_config.clone(base_url=url))
+                    page.url = url
+                    return page
+
+                professor_info_list += await asyncio.gather(*[convert(url) for url in downloaded])
+                logger.info(f"Completed crawling {len(urls_to_crawl)} pages and converting {len(downloaded)} downloaded pages")
+
+            llm_inputs = []
+            for professor_info in professor_info_list:
+                if professor_info.markdown and professor_info.url:
+                    variables = llm_input_for_page(professor_info)
+                    stats["tokens_before"] += estimate_tokens(str(professor_info.markdown))
+                    stats["tokens_after"] += estimate_tokens(variables["markdown"])
+                    llm_inputs.append(variables)
+                else:
+                    logger.warning(f"Skipping professor. No markdown or url found.")
+
+            # Process all LLM calls concurrently; the shared rate limiter sets how many run at once
+            async for variables, professor in llm_astream_batch(llm_chain, llm_inputs):
+                url = variables["src_url"]
+                if not professor:
+                    stats["failed"] += 1
+                    continue
+                stats["re_extracted"] += 1
+                professors[url] = professor
+                fetched = changed.get(url, {})
+                await asyncio.to_thread(store.record_extraction, url, fetched.get("content_hash"), professor,
+                                        fetched.get("etag"), fetched.get("last_modified"))
+            logger.info(f"Successfully processed {stats['re_extracted']} professor profiles")
                 
     except Exception as e:
         logger.error(f"Error during professor information extraction: {e}")
-        research_info = []
-            
-    return research_info
+        if not professors:
+            return []
+
+    stats["skipped"] = stats["not_modified"] + stats["unchanged"]
+    record_run_stats(stats_key, stats)
+    logger.info(f"Incremental crawl stats for {stats_key}: {stats}")
+
+    # Keep the faculty page order
+    return [professors[url] for url in url_list if url in professors]
 
 async def extract_department_research(department_code, debug_mode=False) -> List[dict]:
     """
@@ -137,10 +298,27 @@ async def extract_department_research(department_code, debug_mode=False) -> List
         logger.warning(f"No faculty URLs found for department: {department_code}")
         return []
 
-    research_info = await extract_professor_information(faculty_urls, debug_mode=debug_mode)
+    research_info = await extract_professor_information(faculty_urls, debug_mode=debug_mode,
+                                                        stats_key=f"research:{department_code}")
     return research_info
 
 
+async def _persist_research(department_code: str, research_info: List[dict]) -> None:
+    """
+    Writes professors to the database through the write queue, or directly when no queue is running.
+    """
+    try:
+        write_queue = get_write_queue()
+        if write_queue is not None:
+            # Batched and written in the background; callers needing read-after-write use write_queue.flush()
+            await write_queue.put(research_info)
+        else:
+            await asyncio.to_thread(write_to_db, research_info)
+    except Exception as e:
+        # A database outage shouldn't throw away a finished extraction
+        logger.error(f"Failed to write research for {department_code} to the database: {e}")
+
+
 # 'public' wrapper. Other files import this function
 async def extract_research_by_department(department_code: str, debug_mode: bool=False, write_to_csv: bool = False) -> None:
     """
@@ -154,11 +332,65 @@ async def extract_research_by_department(department_code: str, debug_mode: bool=
     """
 
     research_info = await extract_department_research(department_code, debug_mode)
-    write_to_db(research_info)
+    await _persist_research(department_code, research_info)
     if research_info and write_to_csv:
         csv_writer(research_info, f"research_{department_code}.csv")
     return research_info
 
+async def stream_research_by_department(department_code: str, debug_mode: bool=False) -> AsyncIterator[dict]:
+    """
+    Streams research information for a department, yielding each professor as soon as
+    their page has been crawled and extracted. Each professor is also queued for the database.
+
+    The browser lease only covers the crawl: crawled pages are handed to the LLM through a queue,
+    so the pages go back to the pool as soon as the last one is crawled rather than after the
+    last LLM call.
+
+    Args:
+        department_code: Department identifier (e.g., 'CSCI')
+
+    Yields:
+        Professor research information dictionaries, in completion order
+    """
+    faculty_urls = await extract_faculty_urls(department_code, debug_mode=debug_mode)
+    if not faculty_urls:
+        logger.warning(f"No faculty URLs found for department: {department_code}")
+        return
+
+    prompt_template = ChatPromptTemplate.from_messages(config.get_llm_prompt())
+    llm_chain = llm_init(prompt_template, ProfessorPage, model="gemini-2.5-flash-lite", model_provider="google-genai")
+    browser_config = BrowserConfig(headless=(not debug_mode))
+    crawled = asyncio.Queue()
+
+    async def crawl():
+        try:
+            async with get_crawler(browser_config, pages=len(faculty_urls)) as crawler:
+                # stream=True yields each page as soon as it is crawled
+                pages = await crawler.arun_many(faculty_urls, config=CrawlerRunConfig(stream=True, **config.get_profile_crawler_config()))
+                async for page in pages:
+                    if page.markdown and page.url:
+                        crawled.put_nowait(llm_input_for_page(page))
+                    else:
+                        logger.warning(f"Skipping professor. No markdown or url found.")
+        finally:
+            crawled.put_nowait(None)
+
+    async def llm_inputs():
+        while (variables := await crawled.get()) is not None:
+            yield variables
+
+    crawl_task = asyncio.create_task(crawl())
+    try:
+        async for _, professor in llm_astream_batch(llm_chain, llm_inputs()):
+            if professor:
+                await _persist_research(department_code, [professor])
+                yield professor
+        # Surface a crawl failure rather than ending the stream as if it were complete
+        await crawl_task
+    finally:
+        crawl_task.cancel()
+        await asyncio.gather(crawl_task, return_exceptions=True)
+
 if __name__ == "__main__":
     res = asyncio.run(extract_research_by_department("CSCI", debug_mode=False, write_to_csv=True))
     print(res)
\ No newline at end of file
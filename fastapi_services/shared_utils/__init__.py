@@ -1,6 +1,23 @@
-from .csv_writer import csv_writer
+from .csv_writer import csv_writer, CsvSink, write_csv, awrite_csv, tee_to_csv
 from .llm_init import llm_init
-from .llm_batch_processor import llm_ainvoke_batch
-from .db_writer import write_to_db
+from .llm_batch_processor import llm_ainvoke_batch, llm_astream_batch
+from .db_writer import write_to_db, init_db, close_db_pool
+from .write_queue import WriteQueue, start_write_queue, close_write_queue, get_write_queue
+from .job_store import JobStore
+from .single_flight import SingleFlight
+from .response_cache import ResponseCache
+from .http_client import get_http_client, close_http_client
+from .page_state import get_page_state_store, conditional_fetch, content_hash, record_run_stats, get_run_stats
+from .browser_pool import get_crawler, get_browser_pool, start_browser_pool, close_browser_pool
+from .llm_cache import LLMCache, CachedChain, get_llm_cache, get_llm_cache_stats
+from .llm_packer import PackedExtractor, pack_chunks
+from .rate_limiter import AdaptiveRateLimiter, RateLimitedChain, get_rate_limiter, get_rate_limiter_stats, estimate_tokens
 
-__all__ = ['csv_writer', 'llm_init', 'llm_ainvoke_batch', 'write_to_db']
\ No newline at end of file
+__all__ = ['csv_writer', 'CsvSink', 'write_csv', 'awrite_csv', 'tee_to_csv', 'llm_init', 'llm_ainvoke_batch', 'llm_astream_batch', 'write_to_db', 'init_db', 'close_db_pool',
+           'WriteQueue', 'start_write_queue', 'close_write_queue', 'get_write_queue', 'JobStore', 'SingleFlight', 'ResponseCache',
+           'get_http_client', 'close_http_client',
+           'get_page_state_store', 'conditional_fetch', 'content_hash', 'record_run_stats', 'get_run_stats',
+           'get_crawler', 'get_browser_pool', 'start_browser_pool', 'close_browser_pool',
+           'LLMCache', 'CachedChain', 'get_llm_cache', 'get_llm_cache_stats',
+           'PackedExtractor', 'pack_chunks',
+           'AdaptiveRateLimiter', 'RateLimitedChain', 'get_rate_limiter', 'get_rate_limiter_stats', 'estimate_tokens']
\ No newline at end of file
@@ -0,0 +1,251 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from crawl4ai import AsyncWebCrawler, BrowserConfig, SemaphoreDispatcher
+
+try:
+    import psutil
+except ImportError:  # psutil ships with crawl4ai, but the memory check is optional
+    psutil = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class _PooledBrowser:
+    """
+    A launched crawler plus the bookkeeping needed to decide when to recycle it.
+    """
+
+    def __init__(self, crawler: AsyncWebCrawler, generation: int):
+        self.crawler = crawler
+        self.generation = generation
+        self.pages_served = 0
+        self.active_leases = 0
+        self.retired = False
+
+
+class _LeasedCrawler:
+    """
+    The pool's crawler as seen by one lease. arun_many never opens more pages at once than the
+    lease holds, and every page actually opened counts towards the browser's recycle budget.
+    """
+
+    def __init__(self, crawler: AsyncWebCrawler, pages: int):
+        self._crawler = crawler
+        self.pages = pages
+        self.pages_opened = 0
+
+    async def arun(self, url: str, *args, **kwargs):
+        # raw: URLs are HTML the caller already has, converted without opening a page
+        if not url.startswith("raw:"):
+            self.pages_opened += 1
+        return await self._crawler.arun(url, *args, **kwargs)
+
+    async def arun_many(self, urls: List[str], *args, dispatcher=None, **kwargs):
+        urls = list(urls)
+        self.pages_opened += sum(1 for url in urls if not url.startswith("raw:"))
+        if dispatcher is None:
+            # crawl4ai's default dispatcher would open up to 20 pages regardless of the lease
+            dispatcher = SemaphoreDispatcher(semaphore_count=self.pages, max_session_permit=self.pages)
+        return await self._crawler.arun_many(urls, *args, dispatcher=dispatcher, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._crawler, name)
+
+
+class BrowserPool:
+    """
+    Process-wide pool of headless browsers shared by every extractor.
+
+    Extractors lease the current crawler with `async with pool.crawler(pages=n)`. The pool caps the
+    number of pages in use across all leases (a lease's arun_many crawls at most its pages at once), and recycles the browser once it has served
+    max_pages_per_browser pages or its process tree passes max_rss_mb. A retired browser is closed
+    once its last lease is returned; new leases go to a freshly launched browser.
+    """
+
+    def __init__(self, max_pages: int = 8, max_pages_per_browser: int = 500, max_rss_mb: int = 2048):
+        self.max_pages = max_pages
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_rss_mb = max_rss_mb
+        self._browser_config = BrowserConfig(headless=True)
+        self._available_pages = max_pages
+        self._pages_freed = asyncio.Condition()
+        self._launch_lock = asyncio.Lock()
+        self._current: Optional[_PooledBrowser] = None
+        self._retiring: set = set()
+        self._generation = 0
+        self._closed = False
+        self._launches = 0
+        self._recycles = 0
+
+    async def start(self):
+        """
+        Launches the first browser so the cold-start cost is paid at startup.
+        """
+        await self._get_browser()
+
+    async def close(self):
+        """
+        Closes every browser owned by the pool.
+        """
+        self._closed = True
+        browsers = list(self._retiring)
+        if self._current:
+            browsers.append(self._current)
+        self._current = None
+        self._retiring.clear()
+        for browser in browsers:
+            await self._close_browser(browser)
+
+    @asynccontextmanager
+    async def crawler(self, pages: int = 1) -> AsyncIterator[_LeasedCrawler]:
+        """
+        Leases the pool's crawler for a unit of work.
+
+        Args:
+            pages: Number of pages the work will open (e.g. the number of URLs passed to arun_many).
+                   Clamped to the pool size so a single large batch cannot wait forever; the batch
+                   is then crawled that many pages at a time.
+        """
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        pages = max(1, min(pages, self.max_pages))
+        async with self._pages_freed:
+            await self._pages_freed.wait_for(lambda: self._available_pages >= pages)
+            self._available_pages -= pages
+        try:
+            browser = await self._get_browser()
+            browser.active_leases += 1
+            leased = _LeasedCrawler(browser.crawler, pages)
+            try:
+                yield leased
+            finally:
+                browser.active_leases -= 1
+                browser.pages_served += leased.pages_opened
+                await self._maybe_recycle(browser)
+        finally:
+            async with self._pages_freed:
+                self._available_pages += pages
+                self._pages_freed.notify_all()
+
+    async def _get_browser(self) -> _PooledBrowser:
+        async with self._launch_lock:
+            if self._current is None:
+                self._generation += 1
+                crawler = AsyncWebCrawler(config=self._browser_config)
+                await crawler.start()
+                self._current = _PooledBrowser(crawler, self._generation)
+                self._launches += 1
+                logger.info(f"Launched pooled browser (generation {self._generation})")
+            return self._current
+
+    async def _maybe_recycle(self, browser: _PooledBrowser):
+        if not browser.retired:
+            reason = None
+            if browser.pages_served >= self.max_pages_per_browser:
+                reason = f"served {browser.pages_served} pages"
+            else:
+                rss_mb = self._browser_rss_mb()
+                if rss_mb is not None and rss_mb >= self.max_rss_mb:
+                    reason = f"RSS reached {rss_mb:.0f} MB"
+            if reason:
+                logger.info(f"Recycling pooled browser (generation {browser.generation}): {reason}")
+                browser.retired = True
+                self._recycles += 1
+                async with self._launch_lock:
+                    if self._current is browser:
+                        self._current = None
+                self._retiring.add(browser)
+
+        if browser.retired and browser.active_leases == 0 and browser in self._retiring:
+            self._retiring.discard(browser)
+            await self._close_browser(browser)
+
+    @staticmethod
+    async def _close_browser(browser: _PooledBrowser):
+        try:
+            await browser.crawler.close()
+        except Exception as e:
+            logger.error(f"Error closing pooled browser (generation {browser.generation}): {e}")
+
+    @staticmethod
+    def _browser_rss_mb() -> Optional[float]:
+        """
+        Resident memory of this process's children (the Playwright driver and Chromium), in MB.
+        """
+        if psutil is None:
+            return None
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+    def stats(self) -> Dict:
+        """
+        Live pool state for monitoring.
+        """
+        return {
+            "max_pages": self.max_pages,
+            "pages_in_use": self.max_pages - self._available_pages,
+            "generation": self._generation,
+            "pages_served": self._current.pages_served if self._current else 0,
+            "active_leases": self._current.active_leases if self._current else 0,
+            "retiring_browsers": len(self._retiring),
+            "launches": self._launches,
+            "recycles": self._recycles,
+            "browser_rss_mb": self._browser_rss_mb(),
+        }
+
+
+# Pool owned by the FastAPI lifespan. None when running extractors as standalone scripts.
+_pool: Optional[BrowserPool] = None
+
+
+async def start_browser_pool(max_pages: int = 8, max_pages_per_browser: int = 500, max_rss_mb: int = 2048) -> BrowserPool:
+    """
+    Creates and warms up the process-wide browser pool.
+    """
+    global _pool
+    _pool = BrowserPool(max_pages, max_pages_per_browser, max_rss_mb)
+    await _pool.start()
+    return _pool
+
+
+async def close_browser_pool():
+    """
+    Closes the process-wide browser pool, if one is running.
+    """
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_browser_pool() -> Optional[BrowserPool]:
+    return _pool
+
+
+@asynccontextmanager
+async def get_crawler(browser_config: BrowserConfig, pages: int = 1) -> AsyncIterator[AsyncWebCrawler]:
+    """
+    Leases a crawler from the process-wide pool.
+
+    Falls back to launching a dedicated crawler when no pool is running (standalone scripts)
+    or when the config asks for a visible browser (debug mode).
+
+    Args:
+        browser_config: Browser configuration the caller would have used on its own.
+        pages: Number of pages the caller will open.
+    """
+    if _pool is None or not browser_config.headless:
+        async with AsyncWebCrawler(config=browser_config) as crawler:
+            yield crawler
+        return
+    async with _pool.crawler(pages) as crawler:
+        yield crawler
@@ -0,0 +1,160 @@
+import os
+from typing import Dict
+
+
+def _env_int(name: str, default: int) -> int:
+    """
+    Read an integer setting from the environment, falling back to the default.
+    """
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+def get_extraction_limits() -> Dict[str, int]:
+    """
+    Get concurrency limits for fan-out extraction (/extract/all).
+
+    "global" caps the number of sources running at once across the whole fan-out.
+    The per-source entries cap how many departments of that source run at once.
+    """
+    return {
+        "global": _env_int("EXTRACT_MAX_CONCURRENT", 3),
+        "research": _env_int("EXTRACT_MAX_CONCURRENT_RESEARCH", 2),
+        "events": _env_int("EXTRACT_MAX_CONCURRENT_EVENTS", 1),
+        "courses": _env_int("EXTRACT_MAX_CONCURRENT_COURSES", 2),
+    }
+
+
+def get_llm_settings() -> Dict:
+    """
+    Get limits for LLM calls made while extracting a single source.
+    """
+    return {
+        # Concurrent LLM calls for the chunks of one extraction, e.g. catalog course blocks
+        "max_concurrent": _env_int("LLM_MAX_CONCURRENT", 5),
+        # Small chunks are packed into one request up to this many estimated input tokens...
+        "pack_max_tokens": _env_int("LLM_PACK_MAX_TOKENS", 6000),
+        # ...and at most this many chunks
+        "pack_max_chunks": _env_int("LLM_PACK_MAX_CHUNKS", 25),
+    }
+
+
+def get_llm_rate_limit_settings() -> Dict:
+    """
+    Get limits shared by every LLM call to one provider and model, across all extractions.
+    """
+    return {
+        "requests_per_minute": _env_int("LLM_REQUESTS_PER_MINUTE", 300),
+        # Estimated input tokens per minute
+        "tokens_per_minute": _env_int("LLM_TOKENS_PER_MINUTE", 1000000),
+        # Concurrency adapts between these bounds: it halves on throttling and grows back while healthy
+        "max_concurrency": _env_int("LLM_MAX_CONCURRENCY", 10),
+        "min_concurrency": _env_int("LLM_MIN_CONCURRENCY", 1),
+        # Retries of a throttled call, with jittered exponential backoff
+        "max_retries": _env_int("LLM_MAX_RETRIES", 5),
+        "base_backoff": float(os.getenv("LLM_BASE_BACKOFF_SECONDS", "1")),
+        "max_backoff": float(os.getenv("LLM_MAX_BACKOFF_SECONDS", "60")),
+    }
+
+
+def get_database_settings() -> Dict:
+    """
+    Get Postgres connection and pool settings for the research writer.
+    """
+    return {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": _env_int("DB_PORT", 5432),
+        "dbname": os.getenv("DB_NAME", "wwu_degree_works"),
+        "user": os.getenv("DB_USER", "admin"),
+        # No default: set DB_PASSWORD (or PGPASSWORD / ~/.pgpass)
+        "password": os.getenv("DB_PASSWORD"),
+        "min_connections": _env_int("DB_POOL_MIN_CONNECTIONS", 1),
+        "max_connections": _env_int("DB_POOL_MAX_CONNECTIONS", 5),
+        # Rows per execute_values statement
+        "batch_size": _env_int("DB_BATCH_SIZE", 500),
+    }
+
+
+def get_write_queue_settings() -> Dict:
+    """
+    Get settings for the queue that batches database writes off the request path.
+    """
+    return {
+        # Extractors wait to enqueue once this many records are pending
+        "max_size": _env_int("WRITE_QUEUE_MAX_SIZE", 10000),
+        # A batch is written once this many records are waiting...
+        "batch_size": _env_int("WRITE_QUEUE_BATCH_SIZE", 500),
+        # ...or this many seconds after its first record arrived
+        "flush_interval": float(os.getenv("WRITE_QUEUE_FLUSH_INTERVAL_SECONDS", "2")),
+    }
+
+
+def get_job_settings() -> Dict:
+    """
+    Get settings for the asynchronous extraction job store.
+    """
+    return {
+        "path": os.getenv("JOB_STORE_PATH", "./data/jobs.sqlite3"),
+        # Active jobs without a heartbeat for this long are treated as interrupted
+        "stale_after": _env_int("JOB_STALE_AFTER_SECONDS", 60),
+        "heartbeat_interval": _env_int("JOB_HEARTBEAT_INTERVAL_SECONDS", 15),
+    }
+
+
+def get_browser_pool_settings() -> Dict[str, int]:
+    """
+    Get limits for the process-wide headless browser pool.
+    """
+    return {
+        # Pages open at once across every extractor
+        "max_pages": _env_int("BROWSER_POOL_MAX_PAGES", 8),
+        # Recycle the browser after it has served this many pages...
+        "max_pages_per_browser": _env_int("BROWSER_POOL_MAX_PAGES_PER_BROWSER", 500),
+        # ...or once the browser processes use this much resident memory
+        "max_rss_mb": _env_int("BROWSER_POOL_MAX_RSS_MB", 2048),
+    }
+
+
+def get_response_cache_settings() -> Dict:
+    """
+    Get settings for the extraction response cache.
+
+    TTLs are per source, in seconds. Faculty and catalog pages change rarely; events change daily.
+    """
+    return {
+        "path": os.getenv("RESPONSE_CACHE_PATH", "./data/response_cache.sqlite3"),
+        "ttls": {
+            "research": _env_int("CACHE_TTL_RESEARCH_SECONDS", 7 * 24 * 3600),
+            "courses": _env_int("CACHE_TTL_COURSES_SECONDS", 7 * 24 * 3600),
+            "events": _env_int("CACHE_TTL_EVENTS_SECONDS", 6 * 3600),
+        },
+        "max_memory_entries": _env_int("CACHE_MAX_MEMORY_ENTRIES", 64),
+        "max_disk_entries": _env_int("CACHE_MAX_DISK_ENTRIES", 512),
+    }
+
+
+def get_page_state_settings() -> Dict:
+    """
+    Get settings for the incremental re-crawl page state store.
+    """
+    return {
+        "path": os.getenv("PAGE_STATE_PATH", "./data/page_state.sqlite3"),
+        # Concurrent conditional requests when checking pages for changes
+        "max_concurrent_checks": _env_int("PAGE_STATE_MAX_CONCURRENT_CHECKS", 8),
+    }
+
+
+def get_llm_cache_settings() -> Dict:
+    """
+    Get settings for the content-addressed LLM extraction cache.
+    """
+    return {
+        "enabled": os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("0", "false", "no"),
+        "path": os.getenv("LLM_CACHE_PATH", "./data/llm_cache.sqlite3"),
+        # Least recently used entries are evicted beyond this total size
+        "max_bytes": _env_int("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024),
+        # 0 keeps entries until they are evicted
+        "ttl_seconds": _env_int("LLM_CACHE_TTL_SECONDS", 0),
+    }
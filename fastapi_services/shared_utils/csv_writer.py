@@ -1,14 +1,214 @@
 import csv
-from typing import List, Dict
-import logging
+import gzip
 import os
-import sys
+import tempfile
+import time
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Union
+import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 LOGS_PATH = './logs'
 
+MODES = ("overwrite", "append", "rotate")
+
+
+def _open_csv(path: str, mode: str, compress: bool):
+    if compress:
+        return gzip.open(path, mode + "t", newline="", encoding="utf-8")
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+class CsvSink:
+    """
+    Writes records to a CSV file incrementally and publishes it atomically.
+
+    Rows go to a temporary file next to the target, which only replaces the target on commit(),
+    so readers never see a half-written file and a failed extraction leaves the previous file in
+    place. Without a fixed schema, the header is the union of every record's keys: when a record
+    brings new keys, the rows written so far are copied to a new temp file with the wider header.
+    With a fixed schema, extra keys are dropped.
+
+    Modes:
+        overwrite: replace the target
+        append: keep the target's rows and add the new ones after them
+        rotate: move the target aside to a timestamped copy (keeping the newest `keep`) first
+    """
+
+    def __init__(self, filename: str, fieldnames: Optional[Sequence[str]] = None, compress: bool = False,
+                 mode: str = "overwrite", keep: int = 5, directory: str = LOGS_PATH):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, not {mode!r}")
+        if compress and not filename.endswith(".gz"):
+            filename += ".gz"
+        self.path = os.path.join(directory, filename)
+        self.fixed_schema = fieldnames is not None
+        self.fieldnames: List[str] = list(fieldnames or [])
+        self.compress = compress
+        self.mode = mode
+        self.keep = keep
+        self.count = 0
+        self._file = None
+        self._writer = None
+        self._tmp_path: Optional[str] = None
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def __enter__(self) -> "CsvSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def _new_temp(self, fieldnames: List[str]):
+        directory, name = os.path.split(self.path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+        os.close(fd)
+        # mkstemp files are private; published CSVs keep the usual permissions
+        os.chmod(tmp_path, 0o644)
+        csvfile = _open_csv(tmp_path, "w", self.compress)
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        return tmp_path, csvfile, writer
+
+    def write(self, record: Dict):
+        """
+        Appends one record to the temp file.
+        """
+        if not self.fixed_schema:
+            new_keys = [key for key in record if key not in self.fieldnames]
+            if new_keys:
+                self._widen(new_keys)
+        if self._writer is None:
+            self._tmp_path, self._file, self._writer = self._new_temp(self.fieldnames)
+        self._writer.writerow(record)
+        self.count += 1
+
+    def write_many(self, records: Iterable[Dict]):
+        for record in records:
+            self.write(record)
+
+    def _widen(self, new_keys: List[str]):
+        self.fieldnames.extend(new_keys)
+        if self._writer is None:
+            return
+        # Rewrite the rows so far under the wider header
+        self._file.close()
+        old_path = self._tmp_path
+        self._tmp_path, self._file, self._writer = self._new_temp(self.fieldnames)
+        with _open_csv(old_path, "r", self.compress) as old:
+            self._writer.writerows(csv.DictReader(old))
+        os.remove(old_path)
+
+    def commit(self) -> int:
+        """
+        Publishes the temp file at the target path.
+
+        Returns:
+            Number of records written. Nothing is published when there were none.
+        """
+        if self._writer is None:
+            logger.warning("No data to write.")
+            return 0
+        self._file.close()
+        self._writer = None
+        if os.path.exists(self.path):
+            if self.mode == "append":
+                self._merge_existing()
+            elif self.mode == "rotate":
+                self._rotate()
+        os.replace(self._tmp_path, self.path)
+        logger.info(f"Data written to {self.path} ({self.count} records)")
+        return self.count
+
+    def abort(self):
+        """
+        Discards the temp file and leaves the target untouched.
+        """
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+        if self._tmp_path and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+        self._writer = None
+
+    def _merge_existing(self):
+        # Existing rows first, then ours, under the union of both headers
+        with _open_csv(self.path, "r", self.compress) as existing:
+            existing_reader = csv.DictReader(existing)
+            fieldnames = list(existing_reader.fieldnames or [])
+            fieldnames += [key for key in self.fieldnames if key not in fieldnames]
+            new_tmp, new_file, new_writer = self._new_temp(fieldnames)
+            with new_file:
+                new_writer.writerows(existing_reader)
+                with _open_csv(self._tmp_path, "r", self.compress) as ours:
+                    new_writer.writerows(csv.DictReader(ours))
+        os.remove(self._tmp_path)
+        self._tmp_path = new_tmp
+
+    def _rotate(self):
+        directory, name = os.path.split(self.path)
+        stem, ext = name.split(".", 1) if "." in name else (name, "")
+        suffix = f".{ext}" if ext else ""
+        os.replace(self.path, os.path.join(directory, f"{stem}.{time.strftime('%Y%m%d-%H%M%S')}{suffix}"))
+        rotated = sorted(f for f in os.listdir(directory) if f.startswith(f"{stem}.") and f != name and f.endswith(suffix)
+                         and not f.startswith("."))
+        for old in rotated[:-self.keep] if self.keep else rotated:
+            os.remove(os.path.join(directory, old))
+
+
+def write_csv(records: Iterable[Dict], filename: str, **options) -> int:
+    """
+    Streams records from any iterable into a CSV file, publishing it atomically.
+
+    Args:
+        records: Iterable of dictionaries; consumed one at a time.
+        filename: Name of the file under the logs directory.
+        **options: CsvSink options (fieldnames, compress, mode, keep).
+
+    Returns:
+        Number of records written.
+    """
+    with CsvSink(filename, **options) as sink:
+        sink.write_many(records)
+    return sink.count
+
+
+async def awrite_csv(records: Union[AsyncIterable[Dict], Iterable[Dict]], filename: str, **options) -> int:
+    """
+    Async version of write_csv; records may come from an async iterator.
+    """
+    with CsvSink(filename, **options) as sink:
+        if hasattr(records, "__aiter__"):
+            async for record in records:
+                sink.write(record)
+        else:
+            sink.write_many(records)
+    return sink.count
+
+
+async def tee_to_csv(records: AsyncIterable[Dict], filename: str, **options) -> AsyncIterator[Dict]:
+    """
+    Passes records through while writing them to a CSV file, e.g. for a streaming response.
+    The file is only published if the stream is consumed to the end.
+    """
+    sink = CsvSink(filename, **options)
+    completed = False
+    try:
+        async for record in records:
+            sink.write(record)
+            yield record
+        completed = True
+    finally:
+        if completed:
+            sink.commit()
+        else:
+            sink.abort()
+
+
 def csv_writer(data: List[Dict], filename: str):
         """
         Writes extracted information to a CSV file.
@@ -20,17 +220,7 @@ def csv_writer(data: List[Dict], filename: str):
         if not data:
             logger.warning("No data to write.")
             return
-        if not os.path.exists(LOGS_PATH):
-            os.makedirs(LOGS_PATH)
-        # Determine the CSV headers from keys of the first dictionary
-        headers = data[0].keys()
-        filepath = os.path.join(LOGS_PATH, filename)
         try:
-            with open(filepath, mode="w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=headers)
-                writer.writeheader()
-                for row in data:
-                    writer.writerow(row)
-            logger.info(f"Data written to {filename}")
+            write_csv(data, filename)
         except Exception as e:
             logger.error(f"Failed to write CSV: {e}")
\ No newline at end of file
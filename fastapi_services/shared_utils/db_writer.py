@@ -1,56 +1,183 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
 import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+from . import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESEARCH_COLUMNS = ["name", "website", "research_interest", "src_url"]
+
+# Run at startup: only creates what is missing, so it never locks or scans an existing table
+SCHEMA_STATEMENTS = [
+    "CREATE TABLE IF NOT EXISTS research (id SERIAL PRIMARY KEY, name VARCHAR(255), website VARCHAR(255), "
+    "research_interest TEXT, src_url VARCHAR(255), updated_at TIMESTAMPTZ NOT NULL DEFAULT now())",
+    "CREATE UNIQUE INDEX IF NOT EXISTS research_src_url_key ON research (src_url)",
+]
+
+# One-time upgrade of a table created by older versions, which stored interests in a VARCHAR(500),
+# had no timestamp and appended a copy of every professor on each run. These take an exclusive
+# lock and scan the table, so they run from `python -m shared_utils.db_writer --migrate`, not at
+# startup. The unique index is created here because duplicates would make it fail at startup.
+MIGRATION_STATEMENTS = [
+    "ALTER TABLE research ALTER COLUMN research_interest TYPE TEXT",
+    "ALTER TABLE research ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()",
+    # Keep the newest row per page
+    "DELETE FROM research older USING research newer WHERE older.src_url = newer.src_url AND older.id < newer.id",
+    "CREATE UNIQUE INDEX IF NOT EXISTS research_src_url_key ON research (src_url)",
+]
+
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+_schema_ready = False
+
+
+def init_db() -> ThreadedConnectionPool:
+    """
+    Opens the connection pool and brings the schema up to date. Runs once per process;
+    later calls return the existing pool.
+    """
+    global _pool, _schema_ready
+    with _pool_lock:
+        if _pool is None:
+            settings = config.get_database_settings()
+            _pool = ThreadedConnectionPool(
+                settings["min_connections"],
+                settings["max_connections"],
+                host=settings["host"],
+                port=settings["port"],
+                dbname=settings["dbname"],
+                user=settings["user"],
+                password=settings["password"],
+            )
+        if not _schema_ready:
+            with _connection(_pool) as conn, conn.cursor() as cursor:
+                # A legacy table already exists, so its duplicates would make the index fail
+                cursor.execute("SELECT to_regclass('research') IS NOT NULL, to_regclass('research_src_url_key') IS NOT NULL")
+                table_exists, index_exists = cursor.fetchone()
+                if table_exists and not index_exists:
+                    raise RuntimeError("The research table predates upserts; run "
+                                       "`python -m shared_utils.db_writer --migrate` once")
+                for statement in SCHEMA_STATEMENTS:
+                    cursor.execute(statement)
+            _schema_ready = True
+            logger.info("Database schema ready")
+    return _pool
+
+
+def migrate_db():
+    """
+    Upgrades a research table created by an older version. Safe to re-run, but locks the table.
+    """
+    settings = config.get_database_settings()
+    conn = psycopg2.connect(host=settings["host"], port=settings["port"], dbname=settings["dbname"],
+                            user=settings["user"], password=settings["password"])
+    try:
+        with conn, conn.cursor() as cursor:
+            for statement in MIGRATION_STATEMENTS:
+                cursor.execute(statement)
+        logger.info("Research table migrated")
+    finally:
+        conn.close()
+
+
+def close_db_pool():
+    """
+    Closes every pooled connection, if the pool was opened.
+    """
+    global _pool, _schema_ready
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            _schema_ready = False
 
-def test_db_writer():
-    conn = psycopg2.connect(
-        host="localhost",
-        dbname="wwu_degree_works",
-        user="admin",
-        password="test",
-        port="5432"
-    )
-
-    cursor = conn.cursor()
-
-    name = "John Doe"
-    website = "https://www.john-doe.com"
-    research_interest = "Research Interest 1, Research Interest 2"
-    src_url = "https://www.john-doe.com"
-
-    cursor.execute("CREATE TABLE IF NOT EXISTS research (id SERIAL PRIMARY KEY, name VARCHAR(255), website VARCHAR(255), research_interest VARCHAR(255), src_url VARCHAR(255))")
-    cursor.execute("INSERT INTO research (name, website, research_interest, src_url) VALUES (%s, %s, %s, %s)", (name, website, research_interest, src_url))
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-def write_to_db(data):
-    conn = psycopg2.connect(
-        host="localhost",
-        dbname="wwu_degree_works",
-        user="admin",
-        password="test",
-        port="5432"
-    )
-    cursor = conn.cursor()
-    cursor.execute("CREATE TABLE IF NOT EXISTS research (id SERIAL PRIMARY KEY, name VARCHAR(255), website VARCHAR(255), research_interest VARCHAR(500), src_url VARCHAR(255))")
+
+@contextmanager
+def _connection(pool: ThreadedConnectionPool) -> Iterator[psycopg2.extensions.connection]:
+    """
+    Borrows a pooled connection for one transaction: commits on success, rolls back on error.
+    """
+    conn = pool.getconn()
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def _research_row(item: Dict) -> tuple:
+    interests = item.get("research_interest")
+    if isinstance(interests, list):
+        interests = ", ".join(interests)
+    return (item.get("name"), item.get("website"), interests, item["src_url"])
+
+
+def write_to_db(data: List[Dict]) -> Dict[str, int]:
+    """
+    Upserts professor research records, keyed by src_url, in one transaction.
+
+    Rows are bulk loaded into a temporary staging table with execute_values and merged with
+    INSERT ... ON CONFLICT (src_url), so re-running an extraction updates rows instead of
+    duplicating them. Rows whose values did not change are left alone.
+
+    Args:
+        data: Professor dictionaries (name, website, research_interest, src_url)
+
+    Returns:
+        Counts of inserted, updated and unchanged rows.
+    """
+    rows = {}
     for item in data:
-        cursor.execute("INSERT INTO research (name, website, research_interest, src_url) VALUES (%s, %s, %s, %s)", (item["name"], item["website"], item["research_interest"], item["src_url"]))
-    conn.commit()
-    cursor.close()
-    conn.close()
+        if item.get("src_url"):
+            # The last record for a page wins, as it would in sequential upserts
+            rows[item["src_url"]] = _research_row(item)
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not rows:
+        return counts
+
+    batch_size = config.get_database_settings()["batch_size"]
+    columns = ", ".join(RESEARCH_COLUMNS)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in RESEARCH_COLUMNS if column != "src_url")
+    changed = " OR ".join(f"research.{column} IS DISTINCT FROM EXCLUDED.{column}" for column in RESEARCH_COLUMNS)
+
+    with _connection(init_db()) as conn, conn.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMP TABLE research_staging (name VARCHAR(255), website VARCHAR(255), "
+            "research_interest TEXT, src_url VARCHAR(255)) ON COMMIT DROP"
+        )
+        execute_values(cursor, f"INSERT INTO research_staging ({columns}) VALUES %s", list(rows.values()),
+                       page_size=batch_size)
+        cursor.execute(
+            f"INSERT INTO research ({columns}) SELECT {columns} FROM research_staging "
+            f"ON CONFLICT (src_url) DO UPDATE SET {updates}, updated_at = now() WHERE {changed} "
+            # xmax is 0 for freshly inserted rows
+            "RETURNING (xmax = 0)"
+        )
+        for (inserted,) in cursor.fetchall():
+            counts["inserted" if inserted else "updated"] += 1
+    counts["unchanged"] = len(rows) - counts["inserted"] - counts["updated"]
+    logger.info(f"Wrote {len(rows)} research rows: {counts}")
+    return counts
+
 
 def read_from_db():
-    conn = psycopg2.connect(
-        host="localhost",
-        dbname="wwu_degree_works",
-        user="admin",
-        password="test",
-        port="5432"
-    )
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM public.research")
-    table = cursor.fetchall()
+    with _connection(init_db()) as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT * FROM public.research")
+        table = cursor.fetchall()
     print(table)
     return table
 
+
 if __name__ == "__main__":
-    read_from_db()
\ No newline at end of file
+    import sys
+    if "--migrate" in sys.argv:
+        migrate_db()
+    else:
+        read_from_db()
@@ -0,0 +1,38 @@
+import logging
+from typing import Optional
+
+import httpx
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "WWU-Resource-Extractor/1.0"
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide pooled HTTP client, creating it on first use.
+
+    Requests share keep-alive connections instead of opening a new one per call.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_http_client():
+    """
+    Closes the pooled HTTP client, if one was created.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATUSES = (PENDING, RUNNING)
+
+
+class JobStore:
+    """
+    SQLite-backed store for extraction jobs.
+
+    Every job row records the worker that owns it and a heartbeat timestamp. Jobs survive
+    worker restarts: finished results stay readable, and active jobs whose owner stopped
+    heartbeating are marked failed instead of staying "running" forever.
+    """
+
+    def __init__(self, path: str, stale_after: float = 60.0):
+        self.path = path
+        self.stale_after = stale_after
+        # Identifies this process as the owner of the jobs it starts
+        self.worker_id = uuid.uuid4().hex
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    department TEXT,
+                    status TEXT NOT NULL,
+                    progress TEXT,
+                    result TEXT,
+                    error TEXT,
+                    worker_id TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    heartbeat_at REAL NOT NULL,
+                    finished_at REAL
+                )"""
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            # Commits on success, rolls back on error
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, source: str, department: Optional[str] = None) -> str:
+        """
+        Creates a pending job owned by this worker and returns its id.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, source, department, status, progress, worker_id, created_at, updated_at, heartbeat_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, source, department, PENDING, json.dumps({}), self.worker_id, now, now, now),
+            )
+        return job_id
+
+    def start(self, job_id: str):
+        self._update(job_id, status=RUNNING)
+
+    def update_progress(self, job_id: str, progress: Dict[str, Any]):
+        self._update(job_id, progress=json.dumps(progress))
+
+    def succeed(self, job_id: str, result: Any):
+        self._update(job_id, status=SUCCEEDED, result=json.dumps(result), finished_at=time.time())
+
+    def fail(self, job_id: str, error: str):
+        self._update(job_id, status=FAILED, error=error, finished_at=time.time())
+
+    def _update(self, job_id: str, **fields):
+        now = time.time()
+        fields["updated_at"] = now
+        fields["heartbeat_at"] = now
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def heartbeat(self):
+        """
+        Marks every active job owned by this worker as still alive.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET heartbeat_at = ? WHERE worker_id = ? AND status IN ({','.join('?' * len(ACTIVE_STATUSES))})",
+                (time.time(), self.worker_id, *ACTIVE_STATUSES),
+            )
+
+    def fail_stale(self) -> int:
+        """
+        Fails active jobs whose owning worker stopped heartbeating (e.g. it was restarted).
+
+        Returns:
+            Number of jobs marked as failed.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = ?, error = ?, updated_at = ?, finished_at = ? "
+                f"WHERE status IN ({','.join('?' * len(ACTIVE_STATUSES))}) AND heartbeat_at < ?",
+                (FAILED, "Job was interrupted by a worker restart", now, now, *ACTIVE_STATUSES, now - self.stale_after),
+            )
+            count = cursor.rowcount
+        if count:
+            logger.warning(f"Marked {count} interrupted jobs as failed")
+        return count
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Returns a job as a dictionary, or None if it does not exist.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return self._to_dict(row, include_result)
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Returns the most recently created jobs, without their results.
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._to_dict(row, include_result=False) for row in rows]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row, include_result: bool) -> Dict[str, Any]:
+        job = {
+            "job_id": row["id"],
+            "source": row["source"],
+            "department": row["department"],
+            "status": row["status"],
+            "progress": json.loads(row["progress"]) if row["progress"] else {},
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "finished_at": row["finished_at"],
+        }
+        if include_result and row["status"] == SUCCEEDED:
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+        return job
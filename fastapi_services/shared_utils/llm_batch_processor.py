@@ -1,5 +1,7 @@
 import asyncio
+import contextlib
 import logging
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -54,17 +56,66 @@ async def llm_ainvoke_batch(llm_chain, professor_info_list, max_concurrent=5):
     
     return processed_results
 
-async def llm_ainvoke_batch_courses(llm_chain, course_info_list, max_concurrent=5):
+async def _aiter(items: Union[Iterable[Dict], AsyncIterable[Dict]]) -> AsyncIterator[Dict]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def llm_astream_batch(llm_chain, inputs: Union[Iterable[Dict], AsyncIterable[Dict]],
+                            max_concurrent: Optional[int] = None) -> AsyncIterator[Tuple[Dict, Optional[Dict]]]:
     """
-    Process multiple LLM calls concurrently with rate limiting.
-    
+    Process LLM calls concurrently and yield each result as soon as it completes.
+
+    Inputs may be an async iterable (e.g. streamed crawl results), so extraction starts on the
+    first page instead of waiting for the whole crawl. Results are yielded in completion order,
+    not input order. If the consumer stops early, outstanding calls are cancelled.
+
     Args:
         llm_chain: The LLM chain to use
-        course_info_list: List of CrawlerResult objects with .markdown and .url attributes
-        max_concurrent: Maximum number of concurrent LLM calls
-    
-    Returns:
-        List of processed results
+        inputs: Prompt variables for each call, e.g. {"markdown": ..., "src_url": ...}
+        max_concurrent: Optional cap on concurrent LLM calls for this batch. By default the chain's
+            shared rate limiter (see llm_init) decides how many calls run at once.
+
+    Yields:
+        (input variables, extracted record) tuples. The record is None if the call failed.
     """
-    semaphore = asyncio.Semaphore(max_concurrent)
-    
\ No newline at end of file
+    semaphore = asyncio.Semaphore(max_concurrent) if max_concurrent else contextlib.nullcontext()
+    completed: asyncio.Queue = asyncio.Queue()
+
+    async def process_single(variables):
+        async with semaphore:
+            try:
+                logger.info(f"invoking llm for {variables.get('src_url', 'chunk')}")
+                data = await llm_chain.ainvoke(variables)
+                record = data.model_dump() if data else None
+            except Exception as e:
+                logger.error(f"LLM error while extracting info from {variables.get('src_url', 'chunk')}: {e}")
+                record = None
+        completed.put_nowait((variables, record))
+
+    async def feed():
+        tasks = []
+        try:
+            async for variables in _aiter(inputs):
+                tasks.append(asyncio.create_task(process_single(variables)))
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Sentinel: every input has been processed (or the feed failed)
+            completed.put_nowait(None)
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while True:
+            item = await completed.get()
+            if item is None:
+                break
+            yield item
+        # Surface errors from the input iterable (e.g. a failed crawl)
+        await feeder
+    finally:
+        feeder.cancel()
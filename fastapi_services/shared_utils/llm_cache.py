@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Type
+
+from pydantic import BaseModel
+
+from . import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Puts between re-reading the store's true size, which other workers sharing the file also change
+SIZE_RESYNC_PUTS = 100
+
+
+class LLMCache:
+    """
+    Content-addressed SQLite store for structured LLM outputs.
+
+    Values are the model_dump() of the pydantic output, keyed by a hash of everything that
+    determines the answer. The store is bounded by total size with least-recently-used eviction,
+    and entries can optionally expire after a TTL. The total size is tracked as entries are written
+    and removed, so a put doesn't have to sum the table; it is re-read every SIZE_RESYNC_PUTS puts
+    to pick up writes from other processes.
+
+    Methods block on SQLite; async callers run them in a worker thread.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: int = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+        # Guards the counters and the size bookkeeping, updated from worker threads
+        self._lock = threading.Lock()
+        self._puts_since_resync = 0
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    expires_at REAL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)")
+            self._total_bytes = self._stored_bytes(conn)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _stored_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, size, expires_at FROM llm_cache WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                with self._lock:
+                    self.counters["misses"] += 1
+                return None
+            value, size, expires_at = row
+            if expires_at is not None and expires_at < now:
+                conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (key,))
+                with self._lock:
+                    self._total_bytes -= size
+                    self.counters["expired"] += 1
+                    self.counters["misses"] += 1
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE cache_key = ?", (now, key))
+        with self._lock:
+            self.counters["hits"] += 1
+        return json.loads(value)
+
+    def put(self, key: str, value: Dict[str, Any]):
+        now = time.time()
+        encoded = json.dumps(value)
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else None
+        with self._connect() as conn:
+            replaced = conn.execute("SELECT size FROM llm_cache WHERE cache_key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (cache_key, value, size, created_at, accessed_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded), now, now, expires_at),
+            )
+            with self._lock:
+                self.counters["stores"] += 1
+                self._total_bytes += len(encoded) - (replaced[0] if replaced else 0)
+                self._puts_since_resync += 1
+                resync = self._puts_since_resync >= SIZE_RESYNC_PUTS
+                if resync:
+                    self._puts_since_resync = 0
+            if resync:
+                total = self._stored_bytes(conn)
+                with self._lock:
+                    self._total_bytes = total
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """
+        Drops least recently used entries until the store fits in max_bytes.
+        """
+        # Start from the true size: the running total doesn't see other processes' writes
+        total = self._stored_bytes(conn)
+        evicted = 0
+        if total > self.max_bytes:
+            for key, size in conn.execute("SELECT cache_key, size FROM llm_cache ORDER BY accessed_at").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (key,))
+                total -= size
+                evicted += 1
+        with self._lock:
+            self._total_bytes = total
+            self.counters["evictions"] += evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else None,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+
+class CachedChain:
+    """
+    Wraps a prompt | structured-output chain so identical calls are answered from the LLMCache.
+
+    The cache key hashes the prompt template, the model name and provider, the output schema and
+    the input variables (markdown, src_url, html, ...), so changing any of them misses the cache.
+    invoke / ainvoke return the same pydantic type as the wrapped chain; anything else is
+    delegated to it.
+    """
+
+    def __init__(self, chain, cache: LLMCache, prompt_template, pydantic_model: Type[BaseModel], model: str, model_provider: str):
+        self.chain = chain
+        self.cache = cache
+        self.pydantic_model = pydantic_model
+        fingerprint = json.dumps({
+            "prompt": prompt_template.pretty_repr(),
+            "model": model,
+            "model_provider": model_provider,
+            "schema": pydantic_model.model_json_schema(),
+        }, sort_keys=True)
+        self._fingerprint = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def cache_key(self, variables: Dict[str, Any]) -> str:
+        # Inputs can be non-string objects (e.g. BeautifulSoup tags); the prompt sees their str()
+        inputs = json.dumps({name: str(value) for name, value in variables.items()}, sort_keys=True)
+        return hashlib.sha256(f"{self._fingerprint}:{inputs}".encode("utf-8")).hexdigest()
+
+    def _cached(self, key: str) -> Optional[BaseModel]:
+        value = self.cache.get(key)
+        return self.pydantic_model.model_validate(value) if value is not None else None
+
+    def _store(self, key: str, output: Optional[BaseModel]):
+        if output is not None:
+            self.cache.put(key, output.model_dump())
+
+    def invoke(self, variables: Dict[str, Any], *args, **kwargs):
+        key = self.cache_key(variables)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        output = self.chain.invoke(variables, *args, **kwargs)
+        self._store(key, output)
+        return output
+
+    async def ainvoke(self, variables: Dict[str, Any], *args, **kwargs):
+        key = self.cache_key(variables)
+        # The cache is SQLite; keep its reads and writes off the event loop
+        cached = await asyncio.to_thread(self._cached, key)
+        if cached is not None:
+            return cached
+        output = await self.chain.ainvoke(variables, *args, **kwargs)
+        await asyncio.to_thread(self._store, key, output)
+        return output
+
+    def __getattr__(self, name):
+        return getattr(self.chain, name)
+
+
+_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """
+    Returns the process-wide LLM cache, opening it on first use. None when caching is disabled.
+    """
+    global _cache
+    if _cache is None:
+        settings = config.get_llm_cache_settings()
+        if not settings["enabled"]:
+            return None
+        _cache = LLMCache(settings["path"], max_bytes=settings["max_bytes"], ttl_seconds=settings["ttl_seconds"])
+    return _cache
+
+
+def get_llm_cache_stats() -> Optional[Dict[str, Any]]:
+    return _cache.stats() if _cache else None
@@ -5,6 +5,9 @@ from langchain.chat_models import init_chat_model
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
+from .llm_cache import CachedChain, get_llm_cache
+from .rate_limiter import RateLimitedChain, get_rate_limiter, estimate_tokens
+
 logger = logging.getLogger(__name__)
 
 #TODO: make this configurable
@@ -31,4 +34,13 @@ def llm_init(prompt_template, pydantic_model, model, model_provider):
     # chain the llm with the structured output
     structured_llm = llm.with_structured_output(pydantic_model)
     llm_chain = prompt_template | structured_llm
+
+    # every call to this provider and model shares one process-wide rate limiter
+    llm_chain = RateLimitedChain(llm_chain, get_rate_limiter(model_provider, model),
+                                 prompt_tokens=estimate_tokens(prompt_template.pretty_repr()))
+
+    # answer repeated extractions of identical inputs from the cache
+    cache = get_llm_cache()
+    if cache is not None:
+        llm_chain = CachedChain(llm_chain, cache, prompt_template, pydantic_model, model, model_provider)
     return llm_chain
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple, Type
+
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, Field, create_model
+
+from . import config
+from .llm_init import llm_init
+from .rate_limiter import estimate_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PACKING_INSTRUCTIONS = """
+
+                    The input contains several chunks, each wrapped in <chunk id="N"> ... </chunk>.
+                    Extract one record from every chunk and return them all in items.
+                    Set chunk_id on each record to the id of the chunk it came from.
+                    Return exactly one record per chunk, even if a chunk is incomplete.
+"""
+
+
+def pack_chunks(chunks: Sequence[str], max_tokens: int, max_chunks: int) -> List[List[int]]:
+    """
+    Greedily groups chunks, in order, so each group stays within the token budget.
+
+    A chunk larger than the budget gets a group of its own.
+
+    Returns:
+        Lists of chunk indices, one per group.
+    """
+    packs, current, current_tokens = [], [], 0
+    for index, chunk in enumerate(chunks):
+        tokens = estimate_tokens(chunk)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_chunks):
+            packs.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        packs.append(current)
+    return packs
+
+
+class PackedExtractor:
+    """
+    Extracts many small chunks (course blocks, event cards) with one LLM request per pack.
+
+    Chunks are packed up to a token budget and sent under a single system prompt. The model
+    answers with a list-valued schema whose records carry the chunk_id they came from, so each
+    record is mapped back to its source chunk. If a pack's answer does not contain exactly one
+    record per chunk, the pack is split in half and retried; a chunk that still fails on its own
+    yields None. A request that fails outright fails its whole pack without splitting.
+    """
+
+    def __init__(self, prompt_messages: List[Dict[str, str]], pydantic_model: Type[BaseModel], model: str,
+                 model_provider: str, variable: str = "markdown"):
+        """
+        Args:
+            prompt_messages: The single-chunk prompt, as returned by an extractor's get_llm_prompt()
+            pydantic_model: Schema of one record
+            model: LLM model name
+            model_provider: LLM provider, as accepted by llm_init
+            variable: Prompt variable the chunk text is passed in, e.g. "markdown" or "html"
+        """
+        settings = config.get_llm_settings()
+        self.max_tokens = settings["pack_max_tokens"]
+        self.max_chunks = settings["pack_max_chunks"]
+        self.max_concurrent = settings["max_concurrent"]
+        self.variable = variable
+
+        item_model = create_model(
+            f"{pydantic_model.__name__}Item",
+            __base__=pydantic_model,
+            chunk_id=(int, Field(..., description="id of the chunk this record was extracted from")),
+        )
+        self.batch_model = create_model(
+            f"{pydantic_model.__name__}Batch",
+            items=(List[item_model], Field(..., description="One record per input chunk")),
+        )
+        messages = []
+        for message in prompt_messages:
+            content = message["content"]
+            if message["role"] == "system":
+                content += PACKING_INSTRUCTIONS
+            messages.append({**message, "content": content})
+        prompt_template = ChatPromptTemplate.from_messages(messages)
+        self.llm_chain = llm_init(prompt_template, self.batch_model, model, model_provider)
+
+    async def ainvoke(self, chunks: Sequence[str]) -> List[Optional[Dict]]:
+        """
+        Returns:
+            One record per chunk, in input order. Chunks that could not be extracted are None.
+        """
+        results: List[Optional[Dict]] = [None] * len(chunks)
+        async for index, record in self.astream(chunks):
+            results[index] = record
+        return results
+
+    async def astream(self, chunks: Sequence[str]) -> AsyncIterator[Tuple[int, Optional[Dict]]]:
+        """
+        Yields (chunk index, record) pairs as each pack completes. The record is None if extraction failed.
+        """
+        packs = pack_chunks(chunks, self.max_tokens, self.max_chunks)
+        logger.info(f"Packed {len(chunks)} chunks into {len(packs)} LLM requests")
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def run(pack):
+            async with semaphore:
+                return await self._extract_pack(chunks, pack)
+
+        tasks = [asyncio.create_task(run(pack)) for pack in packs]
+        try:
+            for done in asyncio.as_completed(tasks):
+                for index, record in await done:
+                    yield index, record
+        finally:
+            # The consumer stopped early; don't keep paying for packs nobody will read
+            for task in tasks:
+                task.cancel()
+
+    async def _extract_pack(self, chunks: Sequence[str], pack: List[int]) -> List[Tuple[int, Optional[Dict]]]:
+        packed = "\n\n".join(f'<chunk id="{local_id}">\n{chunks[index]}\n</chunk>' for local_id, index in enumerate(pack))
+        try:
+            output = await self.llm_chain.ainvoke({self.variable: packed})
+        except Exception as e:
+            # Outages, auth errors and exhausted retries would fail every half too; don't multiply them
+            logger.error(f"LLM error extracting a pack of {len(pack)} chunks: {e}")
+            return [(index, None) for index in pack]
+
+        records = self._match(output, len(pack))
+        if records is not None:
+            return list(zip(pack, records))
+        if len(pack) == 1:
+            return [(pack[0], None)]
+
+        # The answer did not line up with the chunks; retry each half on its own
+        logger.warning(f"Re-splitting a pack of {len(pack)} chunks")
+        middle = len(pack) // 2
+        left, right = await asyncio.gather(
+            self._extract_pack(chunks, pack[:middle]),
+            self._extract_pack(chunks, pack[middle:]),
+        )
+        return left + right
+
+    @staticmethod
+    def _match(output, count: int) -> Optional[List[Dict]]:
+        """
+        Maps the model's records back to chunk positions.
+
+        Returns:
+            Records in chunk order, or None unless there is exactly one record for every chunk id.
+        """
+        items = output.items if output else []
+        if count == 1 and len(items) == 1:
+            # A lone chunk can only be answered by the lone record, whatever id it was given
+            record = items[0].model_dump()
+            record.pop("chunk_id")
+            return [record]
+        by_id = {}
+        for item in items:
+            record = item.model_dump()
+            by_id[record.pop("chunk_id")] = record
+        if len(items) != count or sorted(by_id) != list(range(count)):
+            return None
+        return [by_id[local_id] for local_id in range(count)]
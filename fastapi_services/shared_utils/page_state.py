@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from . import config
+from .http_client import get_http_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: str, is_html: bool = True) -> str:
+    """
+    Hashes page content after normalizing away markup, scripts and whitespace,
+    so cosmetic changes (tracking scripts, attribute order, indentation) don't count as edits.
+    """
+    if is_html:
+        soup = BeautifulSoup(content, "html.parser")
+        for tag in soup(["script", "style", "noscript"]):
+            tag.decompose()
+        content = soup.get_text(" ")
+    normalized = re.sub(r"\s+", " ", content).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+async def conditional_fetch(url: str, state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Fetches a page with the pooled HTTP client, sending If-None-Match / If-Modified-Since
+    when we hold a reusable extraction for it.
+
+    Returns:
+        {"status": "not_modified"} for a 304, otherwise {"status": "fetched"} with the
+        page's etag, last_modified, normalized content_hash and html, so a changed page can be
+        extracted without downloading it again.
+    """
+    headers = {}
+    if state and state.get("extraction") is not None:
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+    response = await get_http_client().get(url, headers=headers)
+    if response.status_code == 304:
+        return {"status": "not_modified"}
+    response.raise_for_status()
+    return {
+        "status": "fetched",
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        # BeautifulSoup parsing is CPU-bound; keep it off the event loop
+        "content_hash": await asyncio.to_thread(content_hash, response.text),
+        "html": response.text,
+    }
+
+
+class PageStateStore:
+    """
+    SQLite store of what we last saw at each crawled URL: its HTTP validators (ETag,
+    Last-Modified), a normalized content hash and the extraction produced from it.
+    Used to skip refetching and re-extracting pages that have not changed.
+
+    Methods block on SQLite; async callers run them with asyncio.to_thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS page_state (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    extraction TEXT,
+                    fetched_at REAL,
+                    extracted_at REAL
+                )"""
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM page_state WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return self._to_state(row)
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        States of the given URLs that have one, read over a single connection.
+        """
+        states = {}
+        with self._connect() as conn:
+            for url in urls:
+                row = conn.execute("SELECT * FROM page_state WHERE url = ?", (url,)).fetchone()
+                if row is not None:
+                    states[url] = self._to_state(row)
+        return states
+
+    @staticmethod
+    def _to_state(row: sqlite3.Row) -> Dict[str, Any]:
+        state = dict(row)
+        state["extraction"] = json.loads(state["extraction"]) if state["extraction"] else None
+        return state
+
+    def record_unchanged(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        """
+        Refreshes the validators of a page that was downloaded again but whose content hash did not change.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE page_state SET etag = ?, last_modified = ?, fetched_at = ? WHERE url = ?",
+                (etag, last_modified, time.time(), url),
+            )
+
+    def record_extraction(self, url: str, page_hash: Optional[str], extraction: Any,
+                          etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Records the extraction produced for a page's content, together with the validators and
+        hash of that content. Only called once extraction succeeds, so a failed run never pairs a
+        new hash with an old extraction. A None hash means the content could not be fingerprinted,
+        so the extraction is never reused.
+        """
+        self.record_extractions([(url, page_hash, extraction, etag, last_modified)])
+
+    def record_extractions(self, entries: Iterable[Tuple[str, Optional[str], Any, Optional[str], Optional[str]]]):
+        """
+        record_extraction for many pages in one transaction.
+
+        Args:
+            entries: (url, page_hash, extraction, etag, last_modified) tuples.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO page_state (url, etag, last_modified, content_hash, extraction, fetched_at, extracted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified, "
+                "content_hash = excluded.content_hash, extraction = excluded.extraction, "
+                "fetched_at = excluded.fetched_at, extracted_at = excluded.extracted_at",
+                [(url, etag, last_modified, page_hash, json.dumps(extraction), now, now)
+                 for url, page_hash, extraction, etag, last_modified in entries],
+            )
+
+    def prune(self, prefix: str, keep: Iterable[str]) -> int:
+        """
+        Deletes entries under a URL prefix that are not in keep, e.g. catalog blocks that disappeared.
+
+        Returns:
+            Number of entries removed.
+        """
+        keep = set(keep)
+        with self._connect() as conn:
+            rows = conn.execute("SELECT url FROM page_state WHERE substr(url, 1, ?) = ?", (len(prefix), prefix)).fetchall()
+            stale = [(row["url"],) for row in rows if row["url"] not in keep]
+            conn.executemany("DELETE FROM page_state WHERE url = ?", stale)
+        return len(stale)
+
+
+_store: Optional[PageStateStore] = None
+# Callers open the store from worker threads
+_store_lock = threading.Lock()
+
+# Stats from the most recent incremental crawl, keyed by e.g. "research:CSCI"
+_run_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def get_page_state_store() -> PageStateStore:
+    """
+    Returns the process-wide page state store, opening it on first use.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PageStateStore(config.get_page_state_settings()["path"])
+    return _store
+
+
+def record_run_stats(key: str, stats: Dict[str, Any]):
+    _run_stats[key] = {**stats, "finished_at": time.time()}
+
+
+def get_run_stats() -> Dict[str, Dict[str, Any]]:
+    return dict(_run_stats)
@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from . import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Error text that marks a throttling or quota response, whatever client library raised it
+THROTTLE_MARKERS = ("429", "rate limit", "ratelimit", "too many requests", "quota", "resource_exhausted", "resource exhausted")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about four characters per token), good enough for budgeting prompts.
+    """
+    return len(text) // 4 + 1
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """
+    True if an LLM call failed because the provider is throttling us (HTTP 429 or a quota error).
+    """
+    for attr in ("status_code", "code"):
+        if getattr(error, attr, None) == 429:
+            return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    message = f"{type(error).__name__} {error}".lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate, holding at most one minute's worth.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """
+        Seconds until amount tokens are available (0 if they are now).
+        """
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def available(self) -> int:
+        self._refill()
+        return int(self.tokens)
+
+
+class AdaptiveRateLimiter:
+    """
+    Rate limiter shared by every LLM call to one provider and model.
+
+    Requests and input tokens per minute are metered by token buckets. Concurrency adapts AIMD
+    style: it grows by one after a run of healthy responses and halves when the provider throttles
+    us. A throttled call is retried with exponential backoff and full jitter, and every caller for
+    the same key pauses for that backoff so the provider sees the whole process slow down.
+    """
+
+    def __init__(self, key: str, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int,
+                 min_concurrency: int = 1, max_retries: int = 5, base_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.key = key
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = max(min_concurrency, max_concurrency // 2)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.in_flight = 0
+        self._healthy_streak = 0
+        self._paused_until = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.counters = {"calls": 0, "throttled": 0, "retries": 0, "failed": 0}
+
+    async def run(self, fn: Callable[[], Awaitable[Any]], tokens: int = 0) -> Any:
+        """
+        Runs fn() under the limiter, retrying it when the provider throttles.
+
+        Args:
+            fn: Zero-argument callable returning the coroutine that makes the LLM call.
+            tokens: Estimated input tokens of the call.
+
+        Returns:
+            The result of fn().
+        """
+        attempt = 0
+        while True:
+            await self._acquire(tokens)
+            # None until the call finishes: a cancelled call gives its slot back without counting either way
+            throttled = None
+            try:
+                result = await fn()
+                throttled = False
+            except Exception as e:
+                throttled = is_throttle_error(e)
+                if not throttled:
+                    self.counters["failed"] += 1
+                    raise
+                error = e
+            finally:
+                # Shielded so a second cancellation can't stop the slot from being returned
+                await asyncio.shield(self._release(throttled=throttled))
+            if not throttled:
+                self.counters["calls"] += 1
+                return result
+            self.counters["throttled"] += 1
+            if attempt >= self.max_retries:
+                self.counters["failed"] += 1
+                logger.error(f"{self.key} still throttled after {attempt} retries: {error}")
+                raise error
+            delay = self.backoff_delay(attempt, _retry_after(error))
+            attempt += 1
+            self.counters["retries"] += 1
+            logger.warning(f"{self.key} throttled, retry {attempt} in {delay:.1f}s (concurrency {self.concurrency})")
+            await asyncio.sleep(delay)
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter keeps callers that were throttled together from retrying together
+        delay = retry_after if retry_after is not None else random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def _get_condition(self) -> asyncio.Condition:
+        # asyncio primitives belong to one event loop; scripts and tests may run several in turn
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._condition = asyncio.Condition()
+            self.in_flight = 0
+        return self._condition
+
+    async def _acquire(self, tokens: int):
+        async with self._get_condition():
+            while True:
+                now = time.monotonic()
+                wait = max(self._paused_until - now, self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if wait <= 0 and self.in_flight < self.concurrency:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    self.in_flight += 1
+                    return
+                # Wake on a release, or once the buckets have refilled / the pause is over
+                try:
+                    await asyncio.wait_for(self._get_condition().wait(), timeout=wait if wait > 0 else None)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release(self, throttled: Optional[bool]):
+        async with self._get_condition():
+            self.in_flight -= 1
+            if throttled is None:
+                pass
+            elif throttled:
+                self._healthy_streak = 0
+                self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            else:
+                self._healthy_streak += 1
+                if self._healthy_streak >= self.concurrency and self.concurrency < self.max_concurrency:
+                    self._healthy_streak = 0
+                    self.concurrency += 1
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "concurrency": self.concurrency,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "requests_available": self.requests.available(),
+            "tokens_available": self.tokens.available(),
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 1),
+        }
+
+
+class RateLimitedChain:
+    """
+    Wraps an LLM chain so every call goes through the shared limiter for its provider and model.
+    """
+
+    def __init__(self, chain, limiter: AdaptiveRateLimiter, prompt_tokens: int = 0):
+        self.chain = chain
+        self.limiter = limiter
+        self.prompt_tokens = prompt_tokens
+
+    def _estimate(self, variables: Dict[str, Any]) -> int:
+        return self.prompt_tokens + sum(estimate_tokens(str(value)) for value in variables.values())
+
+    async def ainvoke(self, variables: Dict[str, Any], *args, **kwargs):
+        return await self.limiter.run(lambda: self.chain.ainvoke(variables, *args, **kwargs), self._estimate(variables))
+
+    def invoke(self, variables: Dict[str, Any], *args, **kwargs):
+        # Synchronous calls can't wait on the async limiter; they only get the throttling retries
+        for attempt in range(self.limiter.max_retries + 1):
+            try:
+                return self.chain.invoke(variables, *args, **kwargs)
+            except Exception as e:
+                if not is_throttle_error(e) or attempt == self.limiter.max_retries:
+                    raise
+                time.sleep(self.limiter.backoff_delay(attempt, _retry_after(e)))
+
+    def __getattr__(self, name):
+        return getattr(self.chain, name)
+
+
+_limiters: Dict[Tuple[str, str], AdaptiveRateLimiter] = {}
+
+
+def get_rate_limiter(model_provider: str, model: str) -> AdaptiveRateLimiter:
+    """
+    Returns the process-wide limiter for a provider and model, creating it on first use.
+    """
+    key = (model_provider, model)
+    if key not in _limiters:
+        settings = config.get_llm_rate_limit_settings()
+        _limiters[key] = AdaptiveRateLimiter(f"{model_provider}:{model}", **settings)
+    return _limiters[key]
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return {limiter.key: limiter.stats() for limiter in _limiters.values()}
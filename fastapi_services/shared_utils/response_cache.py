@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from .single_flight import SingleFlight
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Cache statuses reported to callers
+HIT = "hit"
+STALE = "stale"
+MISS = "miss"
+BYPASS = "bypass"
+
+
+class ResponseCache:
+    """
+    Two-tier TTL cache for extraction responses with stale-while-revalidate.
+
+    Entries are keyed by source (research, courses, events) and department. A bounded in-memory
+    LRU sits in front of a SQLite tier that survives restarts and is itself LRU-bounded. Once an
+    entry is older than its source's TTL, callers get the stale copy immediately while one
+    background refresh per key reloads it. Loads run as tasks, so a caller that gives up
+    waiting (e.g. a timeout) does not cancel the load for everyone else. SQLite reads and writes
+    run in worker threads, so the disk tier never blocks the event loop.
+    """
+
+    def __init__(self, path: str, ttls: Dict[str, float], max_memory_entries: int = 64, max_disk_entries: int = 512):
+        self.path = path
+        self.ttls = ttls
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        # cache key -> (value, stored_at)
+        self._memory: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        # Loads currently running, by cache key
+        self._loads = SingleFlight()
+        self._counters = {HIT: 0, STALE: 0, MISS: 0, BYPASS: 0}
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    cache_key TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(source: str, department: Optional[str] = None) -> str:
+        return f"{source}:{department or ''}"
+
+    async def get_or_load(self, source: str, department: Optional[str],
+                          loader: Callable[[], Awaitable[Any]], bypass: bool = False) -> Tuple[Any, str, float]:
+        """
+        Returns the cached response for a source/department, loading it when needed.
+
+        Args:
+            source: Source name, used to pick the TTL.
+            department: Department code, or None for sources without departments.
+            loader: Zero-argument callable returning a coroutine that produces a fresh value.
+            bypass: Skip the cached copy and wait for a fresh load.
+
+        Returns:
+            Tuple of (value, cache status, age of the value in seconds).
+        """
+        key = self.make_key(source, department)
+        if bypass:
+            self._counters[BYPASS] += 1
+            return await self._load(key, source, loader), BYPASS, 0.0
+
+        entry = await self._lookup(key)
+        if entry is None:
+            self._counters[MISS] += 1
+            return await self._load(key, source, loader), MISS, 0.0
+
+        value, stored_at = entry
+        age = time.time() - stored_at
+        if age <= self.ttls.get(source, 0):
+            self._counters[HIT] += 1
+            return value, HIT, age
+
+        # Serve the stale copy now and refresh it once in the background
+        self._counters[STALE] += 1
+        if not self._loads.in_flight(key):
+            logger.info(f"Serving stale {key} ({age:.0f}s old), refreshing in background")
+            self._start_load(key, source, loader)
+        return value, STALE, age
+
+    async def put(self, source: str, department: Optional[str], value: Any):
+        """
+        Stores a freshly extracted value, e.g. from a scheduled /extract/all run.
+        """
+        await self._store(self.make_key(source, department), source, value)
+
+    async def invalidate(self, source: Optional[str] = None, department: Optional[str] = None) -> int:
+        """
+        Drops cached entries. With no arguments the whole cache is cleared.
+
+        Returns:
+            Number of disk entries removed.
+        """
+        if source and department:
+            key = self.make_key(source, department)
+            self._memory.pop(key, None)
+            where, params = "cache_key = ?", (key,)
+        elif source:
+            for key in [k for k in self._memory if k.startswith(f"{source}:")]:
+                del self._memory[key]
+            where, params = "source = ?", (source,)
+        else:
+            self._memory.clear()
+            where, params = "1 = 1", ()
+        return await asyncio.to_thread(self._delete_from_disk, where, params)
+
+    async def stats(self) -> Dict[str, Any]:
+        disk_entries = await asyncio.to_thread(self._count_disk_entries)
+        return {
+            **self._counters,
+            "memory_entries": len(self._memory),
+            "disk_entries": disk_entries,
+            "refreshing": self._loads.keys(),
+        }
+
+    async def _load(self, key: str, source: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        # Shielded by SingleFlight so a caller timing out does not cancel the shared load
+        return await self._loads.do(key, lambda: self._load_and_store(key, source, loader))
+
+    def _start_load(self, key: str, source: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        return self._loads.start(key, lambda: self._load_and_store(key, source, loader))
+
+    async def _load_and_store(self, key: str, source: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        # Empty results usually mean a failed crawl, so don't let them replace good data
+        if value:
+            await self._store(key, source, value)
+        return value
+
+    async def _lookup(self, key: str) -> Optional[Tuple[Any, float]]:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        entry = await asyncio.to_thread(self._read_from_disk, key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    async def _store(self, key: str, source: str, value: Any):
+        now = time.time()
+        self._remember(key, (value, now))
+        await asyncio.to_thread(self._write_to_disk, key, source, value, now)
+
+    # SQLite tier, called in worker threads
+
+    def _read_from_disk(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, stored_at FROM responses WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE cache_key = ?", (time.time(), key))
+        return json.loads(row[0]), row[1]
+
+    def _write_to_disk(self, key: str, source: str, value: Any, now: float):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, source, value, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, source, json.dumps(value), now, now),
+            )
+            # Evict least recently used entries beyond the disk bound
+            conn.execute(
+                "DELETE FROM responses WHERE cache_key NOT IN "
+                "(SELECT cache_key FROM responses ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_disk_entries,),
+            )
+
+    def _delete_from_disk(self, where: str, params: tuple) -> int:
+        with self._connect() as conn:
+            return conn.execute(f"DELETE FROM responses WHERE {where}", params).rowcount
+
+    def _count_disk_entries(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _remember(self, key: str, entry: Tuple[Any, float]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one underlying task.
+
+    The first caller for a key starts the task; everyone who asks for the same key while it is
+    running awaits that task and gets its result or its exception. Waiters are shielded from each
+    other, so one caller being cancelled (e.g. a client disconnect or timeout) does not cancel the
+    work the others are waiting on. The key is released as soon as the task finishes.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs fn() once for all concurrent callers with the same key.
+
+        Args:
+            key: Identifies identical work, e.g. "research:CSCI".
+            fn: Zero-argument callable returning the coroutine to run.
+
+        Returns:
+            The shared result of fn().
+        """
+        return await asyncio.shield(self.start(key, fn))
+
+    def start(self, key: str, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """
+        Returns the running task for a key, starting it if nothing is in flight.
+        """
+        task = self._tasks.get(key)
+        if task is not None:
+            self._coalesced += 1
+            logger.info(f"Joining in-flight request for {key}")
+            return task
+
+        task = asyncio.create_task(fn())
+        self._tasks[key] = task
+        task.add_done_callback(lambda done: self._release(key, done))
+        return task
+
+    def _release(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Retrieve the exception so a task nobody awaited any more isn't reported as never retrieved
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"In-flight request for {key} failed: {task.exception()}")
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._tasks
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.keys(),
+            "coalesced": self._coalesced,
+        }
+
+    def keys(self) -> List[str]:
+        return sorted(self._tasks)
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import config
+from .db_writer import write_to_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class _Ticket:
+    """
+    Tracks the records of one put() call until every one of them has been written.
+    """
+
+    def __init__(self, count: int):
+        self.remaining = count
+        self.error: Optional[Exception] = None
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def done(self, count: int, error: Optional[Exception]):
+        self.remaining -= count
+        self.error = self.error or error
+        if self.remaining <= 0 and not self.future.done():
+            if self.error:
+                self.future.set_exception(self.error)
+            else:
+                self.future.set_result(None)
+
+
+class WriteQueue:
+    """
+    Async sink that batches records for a blocking writer (e.g. write_to_db).
+
+    Extractors put records on a bounded queue and return immediately; putting blocks only when
+    the queue is full. A background task flushes a batch once batch_size records are waiting or
+    flush_interval seconds have passed, running the writer in a thread so the event loop never
+    waits on the database. Callers that need read-after-write can wait for their own records
+    (put(wait=True)) or for everything queued so far (flush()).
+    """
+
+    def __init__(self, writer: Callable[[List[Dict]], Any], max_size: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 2.0):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "asyncio.Queue[Tuple[Dict, Optional[_Ticket]]]" = asyncio.Queue(maxsize=max_size)
+        self._flush_now = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {"enqueued": 0, "written": 0, "failed": 0, "batches": 0}
+        self._latencies: List[float] = []
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """
+        Writes everything still queued, then stops the background task.
+        """
+        if self._task is None:
+            return
+        await self.flush()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def put(self, records: List[Dict], wait: bool = False):
+        """
+        Queues records for writing.
+
+        Args:
+            records: Records to write
+            wait: Also wait until these records have been written, raising if their batch failed.
+        """
+        if not records:
+            return
+        ticket = _Ticket(len(records)) if wait else None
+        for record in records:
+            await self._queue.put((record, ticket))
+        self.counters["enqueued"] += len(records)
+        if ticket is not None:
+            self._flush_now.set()
+            await ticket.future
+
+    async def flush(self):
+        """
+        Waits until every record queued so far has been written (or has failed).
+        """
+        self._flush_now.set()
+        await self._queue.join()
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not self._flush_now.is_set():
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                waiter = asyncio.create_task(self._queue.get())
+                flush = asyncio.create_task(self._flush_now.wait())
+                done, _ = await asyncio.wait({waiter, flush}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                flush.cancel()
+                if waiter in done:
+                    batch.append(waiter.result())
+                else:
+                    waiter.cancel()
+                    # A get() can complete while being cancelled; don't lose its record
+                    try:
+                        batch.append(await waiter)
+                    except asyncio.CancelledError:
+                        pass
+            # Keep flushing without waiting until the queue is drained
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            if self._queue.empty():
+                self._flush_now.clear()
+            await self._write(batch)
+
+    async def _write(self, batch: List[Tuple[Dict, Optional[_Ticket]]]):
+        started = time.monotonic()
+        error = None
+        try:
+            await asyncio.to_thread(self.writer, [record for record, _ in batch])
+            self.counters["written"] += len(batch)
+        except Exception as e:
+            error = e
+            self.counters["failed"] += len(batch)
+            logger.error(f"Failed to write a batch of {len(batch)} records: {e}")
+        self.counters["batches"] += 1
+        self._latencies = (self._latencies + [time.monotonic() - started])[-100:]
+
+        per_ticket: Dict[_Ticket, int] = {}
+        for _, ticket in batch:
+            if ticket is not None:
+                per_ticket[ticket] = per_ticket.get(ticket, 0) + 1
+        for ticket, count in per_ticket.items():
+            ticket.done(count, error)
+        for _ in batch:
+            self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        return {
+            **self.counters,
+            "depth": self._queue.qsize(),
+            "max_size": self._queue.maxsize,
+            "flush_latency_seconds": {
+                "last": round(self._latencies[-1], 3) if latencies else None,
+                "p50": round(latencies[len(latencies) // 2], 3) if latencies else None,
+                "max": round(latencies[-1], 3) if latencies else None,
+            },
+        }
+
+
+_write_queue: Optional[WriteQueue] = None
+
+
+def start_write_queue() -> WriteQueue:
+    """
+    Starts the process-wide queue that writes research records to the database.
+    """
+    global _write_queue
+    if _write_queue is None:
+        _write_queue = WriteQueue(write_to_db, **config.get_write_queue_settings())
+        _write_queue.start()
+    return _write_queue
+
+
+async def close_write_queue():
+    """
+    Flushes and stops the write queue, if it was started.
+    """
+    global _write_queue
+    if _write_queue is not None:
+        await _write_queue.close()
+        _write_queue = None
+
+
+def get_write_queue() -> Optional[WriteQueue]:
+    return _write_queue
@@ -0,0 +1,66 @@
+import os
+import sys
+import unittest
+
+# Add the fastapi_services directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from courses_extractor.course_crawler import parse_course_block
+
+STANDARD_BLOCK = """### CSCI 241 - Data Structures
+
+Fundamental [data structures](https://catalog.wwu.edu/glossary) and their implementation, analysis of
+algorithms and **recursion**.
+
+Prerequisites & Notes
+CSCI 145 and MATH 124.
+
+Credits: 4
+
+Grade Mode: Letter
+---"""
+
+VARIABLE_CREDIT_BLOCK = """### CSCI 400 - Independent Study
+
+Individual study of a topic in computer science arranged with a faculty member.
+
+Credits: 2-4
+---"""
+
+DESCRIPTION_ONLY_BLOCK = """### CSCI 101 - Computers and Applications
+
+An introduction to computers and their use in everyday life.
+
+Credits: 4
+---"""
+
+
+class ParseCourseBlockTests(unittest.TestCase):
+    def test_standard_block(self):
+        self.assertEqual(parse_course_block(STANDARD_BLOCK), {
+            "course_code": "CSCI 241",
+            "course_name": "Data Structures",
+            "course_description": "Fundamental data structures and their implementation, analysis of "
+                                  "algorithms and recursion.",
+            "prereqs": "CSCI 145 and MATH 124.",
+            "credits": 4,
+        })
+
+    def test_variable_credits_fall_back_to_the_llm(self):
+        self.assertIsNone(parse_course_block(VARIABLE_CREDIT_BLOCK))
+
+    def test_no_prerequisites(self):
+        course = parse_course_block(DESCRIPTION_ONLY_BLOCK)
+        self.assertEqual(course["prereqs"], "")
+        self.assertEqual(course["credits"], 4)
+        self.assertEqual(course["course_description"], "An introduction to computers and their use in everyday life.")
+
+    def test_no_description_falls_back_to_the_llm(self):
+        self.assertIsNone(parse_course_block("### CSCI 101 - Computers and Applications\n\nCredits: 4\n---"))
+
+    def test_unrecognized_heading_falls_back_to_the_llm(self):
+        self.assertIsNone(parse_course_block("### Grade Requirements\n\nA grade of C- or better.\n\nCredits: 4\n---"))
+
+
+if __name__ == "__main__":
+    unittest.main()
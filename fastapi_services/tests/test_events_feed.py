@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+import httpx
+
+# Add the fastapi_services directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from events_extractor import events_crawler
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+# What the events page shows for the fixtures, in campus time
+SPIRITED_AWAY = {
+    "event_name": "Fall Film Series: Spirited Away",
+    "date": "Thursday, October 22 at 7:00PM PDT",
+    "page_url": "https://win.wwu.edu/event/10452117",
+}
+RESUME_REVIEW = {
+    "event_name": "Resume Review Drop-ins",
+    "date": "Saturday, October 24 at 10:30AM PDT",
+    "page_url": "https://win.wwu.edu/event/10452930",
+}
+SUNRISE_HIKE = {
+    "event_name": "Lake Padden Sunrise Hike",
+    "date": "Saturday, November 7 at 7:00AM PST",
+    "page_url": "https://win.wwu.edu/event/10453301",
+}
+
+
+class ParseEventCardTests(unittest.TestCase):
+    def test_cards_are_read_without_the_llm(self):
+        cards = events_crawler.prefilter_html(load_fixture("engage_event_cards.html"))
+        events, unparsed = events_crawler.parse_event_cards(cards)
+
+        # The first card's date follows the Date icon, the second's is found by DATE_PATTERN
+        self.assertEqual(events, [SPIRITED_AWAY, RESUME_REVIEW])
+        self.assertEqual(len(unparsed), 1)
+        self.assertIn("/event/10453488", unparsed[0]["href"])
+
+    def test_non_event_links_are_left_for_the_llm(self):
+        cards = events_crawler.prefilter_html('<a href="/organization/asp"><div class="MuiCard-root"><h3>ASP</h3></div></a>')
+        self.assertIsNone(events_crawler.parse_event_card(cards[0]))
+
+
+class EventFeedTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.feed = json.loads(load_fixture("engage_event_feed.json"))
+        self.requests = []
+        self.status_code = 200
+        # Two events per page, so the five fixture items take three requests
+        env = mock.patch.dict(os.environ, {"EVENTS_FEED_PAGE_SIZE": "2", "EVENTS_SOURCE_MODE": "feed"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def handler(self, request):
+        self.requests.append(request)
+        if self.status_code != 200:
+            return httpx.Response(self.status_code)
+        skip, take = int(request.url.params["skip"]), int(request.url.params["take"])
+        return httpx.Response(200, json={"@odata.count": self.feed["@odata.count"],
+                                         "value": self.feed["value"][skip:skip + take]})
+
+    async def asyncSetUp(self):
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        client = mock.patch.object(events_crawler, "get_http_client", return_value=self.client)
+        client.start()
+        self.addCleanup(client.stop)
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_feed_pages_are_fetched_and_deduplicated(self):
+        events = await events_crawler.fetch_event_feed(events_crawler.config.get_base_url())
+
+        # The repeated resume review and the event without a start time are dropped
+        self.assertEqual(events, [SPIRITED_AWAY, RESUME_REVIEW, SUNRISE_HIKE])
+        self.assertEqual(sorted(int(r.url.params["skip"]) for r in self.requests), [0, 2, 4])
+        self.assertEqual(self.requests[0].url.params.get_list("categoryIds"),
+                         ["9821", "17934", "21914", "9822", "11780", "23412", "9830"])
+        self.assertEqual(self.requests[0].url.params["status"], "Approved")
+
+    async def test_crawl_events_uses_the_feed(self):
+        with mock.patch.object(events_crawler, "crawl_events_from_browser") as browser:
+            events = await events_crawler.crawl_events(events_crawler.config.get_base_url())
+        browser.assert_not_called()
+        self.assertEqual(events, [SPIRITED_AWAY, RESUME_REVIEW, SUNRISE_HIKE])
+
+    async def test_feed_failure_falls_back_to_the_browser(self):
+        self.status_code = 503
+        with mock.patch.object(events_crawler, "crawl_events_from_browser",
+                               new=mock.AsyncMock(return_value=[SPIRITED_AWAY])) as browser:
+            events = await events_crawler.crawl_events(events_crawler.config.get_base_url())
+        browser.assert_awaited_once()
+        self.assertEqual(events, [SPIRITED_AWAY])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+from pydantic import BaseModel
+
+# Add the fastapi_services directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared_utils import llm_packer
+from shared_utils.llm_packer import PackedExtractor
+
+
+class Course(BaseModel):
+    course_name: str
+
+
+class FakeChain:
+    """
+    Answers a packed prompt with one record per chunk, dropping the last record of packs larger than drop_over.
+    """
+
+    def __init__(self, batch_model, drop_over=None, error=None):
+        self.batch_model = batch_model
+        self.drop_over = drop_over
+        self.error = error
+        self.calls = []
+
+    async def ainvoke(self, variables):
+        packed = variables["markdown"]
+        count = packed.count("<chunk id=")
+        self.calls.append(count)
+        if self.error:
+            raise self.error
+        items = [{"chunk_id": i, "course_name": f"course {i}"} for i in range(count)]
+        if self.drop_over is not None and count > self.drop_over:
+            items = items[:-1]
+        return self.batch_model.model_validate({"items": items})
+
+
+def extractor(**chain_options):
+    with mock.patch.object(llm_packer, "llm_init", return_value=None):
+        packed_extractor = PackedExtractor([{"role": "system", "content": "Extract the course."}], Course,
+                                           "model", "provider")
+    packed_extractor.llm_chain = FakeChain(packed_extractor.batch_model, **chain_options)
+    return packed_extractor
+
+
+class PackedExtractorTests(unittest.IsolatedAsyncioTestCase):
+    async def test_records_are_mapped_back_to_chunks(self):
+        packed_extractor = extractor()
+        records = await packed_extractor.ainvoke(["CSCI 141", "CSCI 145", "CSCI 241"])
+        self.assertEqual(packed_extractor.llm_chain.calls, [3])
+        self.assertEqual([record["course_name"] for record in records], ["course 0", "course 1", "course 2"])
+
+    async def test_mismatched_answer_is_re_split(self):
+        packed_extractor = extractor(drop_over=2)
+        records = await packed_extractor.ainvoke(["CSCI 141", "CSCI 145", "CSCI 241", "CSCI 247"])
+        self.assertEqual(packed_extractor.llm_chain.calls, [4, 2, 2])
+        self.assertTrue(all(records))
+
+    async def test_failed_request_fails_the_pack_without_re_splitting(self):
+        packed_extractor = extractor(error=RuntimeError("503 Service Unavailable"))
+        records = await packed_extractor.ainvoke(["CSCI 141", "CSCI 145", "CSCI 241", "CSCI 247"])
+        self.assertEqual(packed_extractor.llm_chain.calls, [4])
+        self.assertEqual(records, [None, None, None, None])
+
+
+if __name__ == "__main__":
+    unittest.main()
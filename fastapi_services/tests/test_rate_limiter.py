@@ -0,0 +1,72 @@
+import asyncio
+import os
+import sys
+import unittest
+
+# Add the fastapi_services directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared_utils.rate_limiter import AdaptiveRateLimiter
+
+
+class ThrottleError(Exception):
+    status_code = 429
+
+
+def limiter(max_concurrency=1):
+    return AdaptiveRateLimiter("test:model", requests_per_minute=6000, tokens_per_minute=1000000,
+                               max_concurrency=max_concurrency, max_retries=2, base_backoff=0.01, max_backoff=0.01)
+
+
+class AdaptiveRateLimiterTests(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_call_gives_its_slot_back(self):
+        rate_limiter = limiter()
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.Event().wait()
+
+        async def answer():
+            return "answer"
+
+        call = asyncio.create_task(rate_limiter.run(hang))
+        await started.wait()
+        call.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await call
+
+        self.assertEqual(rate_limiter.in_flight, 0)
+        self.assertEqual(await asyncio.wait_for(rate_limiter.run(answer), timeout=1), "answer")
+
+    async def test_failed_call_gives_its_slot_back(self):
+        rate_limiter = limiter()
+
+        async def fail():
+            raise ValueError("bad request")
+
+        with self.assertRaises(ValueError):
+            await rate_limiter.run(fail)
+        self.assertEqual(rate_limiter.in_flight, 0)
+        self.assertEqual(rate_limiter.counters["failed"], 1)
+
+    async def test_throttled_call_is_retried_and_halves_concurrency(self):
+        rate_limiter = limiter(max_concurrency=8)
+        self.assertEqual(rate_limiter.concurrency, 4)
+        attempts = []
+
+        async def throttled_once():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ThrottleError("429 Too Many Requests")
+            return "answer"
+
+        self.assertEqual(await rate_limiter.run(throttled_once), "answer")
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(rate_limiter.concurrency, 2)
+        self.assertEqual(rate_limiter.in_flight, 0)
+        self.assertEqual(rate_limiter.counters["retries"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()